@@ -1,9 +1,25 @@
+from collections import Counter
+import copy
+import functools
+import json
+import warnings
 from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 from aio_odoorpc_base.helpers import execute_kwargs
 from aio_odoorpc_base.aio import execute_kw, login
 from aio_odoorpc_base.protocols import T_AsyncHttpClient
-from .helpers import _fields_processor
+from .compression import AsyncCompressingHttpClient, Compression, T_Encoding
+from .name_cache import NameCache, _many2one_names
+from .record_cache import RecordCache
+from .transport import AsyncMeasuringHttpClient
+from .helpers import _fields_processor, _lean_fields, _read_group_aggregators, _read_group_check_mergeable, \
+    _read_group_flatten, _read_group_keys, _read_group_merge, _read_group_needs_meta
 from aio_odoorpc import helpers
+# <async-only>
+import asyncio
+from aio_odoorpc.off_loop import AsyncOffLoopHttpClient, OffLoop
+from aio_odoorpc.scheduler import PriorityScheduler
+from aio_odoorpc.single_flight import READ_ONLY_METHODS, SingleFlight, single_flight_key
+# </async-only>
 
 # Domain operators.
 DOMAIN_OPERATORS = ('!', '|', '&')
@@ -27,6 +43,20 @@ class AsyncOdooRPC:
     getter_id_fields: Optional[helpers.T_GETTER_ID] = None
     _context: Optional[dict] = None
     _forced_context: Optional[dict] = None
+    metrics: Counter
+    _fields_get_cache: Dict[str, Dict[str, dict]]
+    _lean_projection: Optional[Dict[str, Dict[str, List[str]]]] = None
+    _large_payload_bytes: Optional[int] = None
+    _compression: Optional[Compression] = None
+    _record_cache: Optional[RecordCache] = None
+    _name_cache: Optional[NameCache] = None
+    _name_batch_size: int = 1000
+    # <async-only>
+    _single_flight: Optional[SingleFlight] = None
+    scheduler: Optional[PriorityScheduler] = None
+    _off_loop: Optional[OffLoop] = None
+    priority: Optional[str] = None
+    # </async-only>
     
     def __init__(self, *,
                  database: str,
@@ -42,6 +72,8 @@ class AsyncOdooRPC:
         self.http_client = http_client
         self.url = url_jsonrpc_endpoint if url_jsonrpc_endpoint is not None else ''
         self.model_name = default_model_name
+        self.metrics = Counter()
+        self._fields_get_cache = dict()
     
     def __copy__(self):
         username_or_uid = self.uid if self.uid else self.username
@@ -49,6 +81,20 @@ class AsyncOdooRPC:
                          password=self.password, http_client=self.http_client,
                          url_jsonrpc_endpoint=self.url, default_model_name=self.model_name)
         new.username = self.username
+        new.metrics = self.metrics
+        new._fields_get_cache = self._fields_get_cache
+        new._lean_projection = self._lean_projection
+        new._large_payload_bytes = self._large_payload_bytes
+        new._compression = self._compression
+        new._record_cache = self._record_cache
+        new._name_cache = self._name_cache
+        new._name_batch_size = self._name_batch_size
+        # <async-only>
+        new._single_flight = self._single_flight
+        new.scheduler = self.scheduler
+        new.priority = self.priority
+        new._off_loop = self._off_loop
+        # </async-only>
         return new
     
     def new_for_model(self, default_model_name: str):
@@ -85,7 +131,103 @@ class AsyncOdooRPC:
                 'list_of_dict': helpers.getter_id_as_list_of_dict}
         
         self.getter_id_fields = opts[fmt]
+    
+    def set_lean_projection(self, enabled: bool = True, *,
+                            allow: Optional[Dict[str, List[str]]] = None,
+                            deny: Optional[Dict[str, List[str]]] = None,
+                            large_payload_bytes: Optional[int] = None):
+        # When enabled, search_read and read invoked with fields=None fetch only the stored fields
+        # that are neither binary nor html instead of every field. The list of fields comes from
+        # fields_get and is cached per model. 'allow' and 'deny' map a model name to fields that are
+        # always/never fetched. Response bodies larger than 'large_payload_bytes' are counted in
+        # metrics ('large_payloads', 'large_payload_bytes'); those of search_read and read called with
+        # fields=None also raise a warning. The size is taken from the http response, so it is not
+        # measured for callable http clients.
+        self._lean_projection = {'allow': allow or {}, 'deny': deny or {}} if enabled else None
+        self._large_payload_bytes = large_payload_bytes
+    
+    # <async-only>
+    def set_single_flight(self, enabled: bool = True):
+        # When enabled, concurrent identical read-only calls (same endpoint, db, uid, model, method,
+        # args, kwargs and context) share one in-flight request. Copies made with new_for_model
+        # share the same in-flight requests. Pass single_flight=False to execute_kw to opt out.
+        self._single_flight = SingleFlight() if enabled else None
+    
+    def set_scheduler(self, enabled: bool = True, *,
+                      max_in_flight: int = 8,
+                      weights: Optional[Dict[str, float]] = None,
+                      default_priority: str = 'interactive'):
+        # When enabled, at most max_in_flight requests are sent at once and the waiting ones are
+        # served weighted-fair between priority classes (default weights: interactive 8, batch 1).
+        # Copies made with new_for_model or with_priority share the same scheduler. Queue wait time
+        # per class goes to metrics as 'queue_wait_seconds:<class>'.
+        self.scheduler = PriorityScheduler(max_in_flight=max_in_flight,
+                                           weights=weights,
+                                           default_priority=default_priority,
+                                           metrics=self.metrics) if enabled else None
+    
+    def set_off_loop(self, enabled: bool = True, *,
+                     threshold_bytes: int = 1024 * 1024,
+                     threshold_rows: int = 5000,
+                     chunk_bytes: int = 256 * 1024,
+                     chunk_rows: int = 1000):
+        # When enabled, response bodies of at least threshold_bytes are json decoded a record at a
+        # time, handing control back to the event loop after every chunk_bytes decoded, and so is
+        # the formatting of id fields for results of at least threshold_rows rows, chunk_rows rows at
+        # a time. json.loads holds the GIL, so running it in a thread or process pool would block the
+        # event loop all the same. Metrics count what was chunked and how often the loop got control
+        # back. Callable http clients whose responses do not expose the raw body are decoded by the
+        # http client, as usual.
+        self._off_loop = OffLoop(threshold_bytes=threshold_bytes,
+                                 threshold_rows=threshold_rows,
+                                 chunk_bytes=chunk_bytes,
+                                 chunk_rows=chunk_rows,
+                                 metrics=self.metrics) if enabled else None
+    
+    def with_priority(self, priority: Optional[str]):
+        # Returns a copy whose calls are scheduled with the given priority class by default,
+        # e.g. batch = odoo.with_priority('batch') for background work. Only the priority differs,
+        # the copy keeps the format for id fields and the contexts.
+        new = self.__copy__()
+        new.getter_id_fields = self.getter_id_fields
+        new._context = self._context
+        new._forced_context = self._forced_context
+        new.priority = priority
+        return new
+    # </async-only>
 
+    def set_compression(self, enabled: bool = True, *,
+                        encoding: T_Encoding = 'gzip',
+                        compress_requests: bool = False,
+                        threshold: int = 16 * 1024,
+                        bandwidth_bytes_per_s: float = 10 * 1024 * 1024):
+        # When enabled, requests are posted by a compressing wrapper around the http client that asks
+        # for compressed responses and, with compress_requests=True (only if the server accepts it),
+        # gzip/zstd compresses request bodies above an adaptive threshold. Raw versus compressed
+        # byte counts go to metrics. See aio_odoorpc.compression.Compression for details.
+        # Callable http clients are used as they are.
+        self._compression = Compression(encoding=encoding,
+                                        compress_requests=compress_requests,
+                                        threshold=threshold,
+                                        bandwidth_bytes_per_s=bandwidth_bytes_per_s,
+                                        metrics=self.metrics) if enabled else None
+    
+    def set_record_cache(self, enabled: bool = True, *, max_records: int = 10000):
+        # When enabled, records fetched with 'read' are kept in an LRU cache (per model and context).
+        # Before being served again, cached records are revalidated with one search_read of their
+        # 'write_date' and only the records that changed since are read again. Odoo's write_date has
+        # a resolution of one second, records written through this object are dropped from the cache.
+        # Models without a write_date (_log_access = False) are read as usual, without caching.
+        self._record_cache = RecordCache(max_records=max_records) if enabled else None
+    
+    def set_name_cache(self, enabled: bool = True, *, max_entries: int = 100000, batch_size: int = 1000):
+        # When enabled, name_get and name_search keep display names in an LRU cache (per model and
+        # context), also fed by the many2one (id, name) pairs of search_read and read results (this
+        # needs fields_get, fetched once per model). name_get only asks the server for unknown ids,
+        # batch_size ids per call. Records renamed through this object are dropped from the cache.
+        self._name_cache = NameCache(max_entries=max_entries) if enabled else None
+        self._name_batch_size = batch_size
+    
     async def search(self, domain: Optional[T_Domain] = None, *,
                      offset: Optional[int] = None,
                      limit: Optional[int] = None,
@@ -118,13 +260,19 @@ class AsyncOdooRPC:
                           model_name: Optional[str] = None,
                           http_client: Optional[T_AsyncHttpClient] = None) -> List[dict]:
         
+        if fields is None and self._lean_projection is not None:
+            fields = await self.__lean_fields(model_name, http_client)
+        
         data = await self.execute_kw(method='search_read',
                                      args=domain,
                                      kwargs=execute_kwargs(fields=fields, offset=offset, limit=limit, order=order),
                                      model_name=model_name,
                                      http_client=http_client)
         
-        return _fields_processor(data=data, fields=fields, getter_id=self.getter_id_fields)
+        if self._name_cache is not None:
+            await self.__seed_names(data, model_name, http_client)
+        
+        return await self.__fields_processor(data, fields)
     
     async def read(self, ids: Union[int, List[int]], *,
                    fields: Optional[List[str]] = None,
@@ -147,14 +295,136 @@ class AsyncOdooRPC:
                 limit = min(limit, len(ids))
                 ids = ids[:limit - 1]
             
-            data = await self.execute_kw(method='read',
+            if fields is None and self._lean_projection is not None:
+                fields = await self.__lean_fields(model_name, http_client)
+            
+            if self._record_cache is not None:
+                data = await self.__read_revalidated(ids, fields, model_name, http_client)
+            else:
+                data = await self.execute_kw(method='read',
+                                             args=ids,
+                                             kwargs=execute_kwargs(fields=fields),
+                                             model_name=model_name,
+                                             http_client=http_client)
+            
+            if self._name_cache is not None:
+                await self.__seed_names(data, model_name, http_client)
+            
+            return await self.__fields_processor(data, fields)
+        
+    async def read_group(self, domain: Optional[T_Domain], fields: List[str], groupby: Union[str, List[str]], *,
+                         offset: Optional[int] = None,
+                         limit: Optional[int] = None,
+                         orderby: Optional[str] = None,
+                         lazy: bool = True,
+                         flatten: bool = True,
+                         model_name: Optional[str] = None,
+                         http_client: Optional[T_AsyncHttpClient] = None) -> List[dict]:
+        # Aggregation runs on the Odoo server, only one row per group travels over the wire.
+        # With flatten=True Odoo's internal keys ('__domain', '__context', '__fold', '__range')
+        # are dropped and the record count of every group is always found under '__count'.
+        groupby = [groupby] if isinstance(groupby, str) else groupby
+        
+        kwargs = execute_kwargs(fields=fields, offset=offset, limit=limit)
+        kwargs.update({'groupby': groupby, 'lazy': lazy})
+        if orderby is not None:
+            kwargs['orderby'] = orderby
+        
+        data = await self.execute_kw(method='read_group',
+                                     args=domain if domain is not None else [],
+                                     kwargs=kwargs,
+                                     model_name=model_name,
+                                     http_client=http_client)
+        
+        if flatten:
+            data = _read_group_flatten(data, groupby=groupby, lazy=lazy)
+        
+        return await self.__fields_processor(data, _read_group_keys(groupby, lazy))
+    
+    async def read_group_merged(self, domains: List[T_Domain], fields: List[str], groupby: Union[str, List[str]], *,
+                                lazy: bool = True,
+                                model_name: Optional[str] = None,
+                                http_client: Optional[T_AsyncHttpClient] = None) -> List[dict]:
+        # Runs the same read_group over each of the (disjoint) domains, concurrently when async,
+        # and merges rows of equal group values. Useful to split one large aggregation in time buckets
+        # (e.g. one domain per month). Aggregates are merged according to the 'name:agg' spec in fields
+        # or, for fields given without one, to the field's group_operator as found by fields_get (cached
+        # per model). count_distinct and array_agg cannot be merged and raise a RuntimeError. Averages
+        # are weighted by the record count of each row, which is exact only for columns without NULLs.
+        fields_meta = await self.__fields_meta(model_name, http_client) if _read_group_needs_meta(fields) else None
+        aggs = _read_group_aggregators(fields, fields_meta)
+        _read_group_check_mergeable(aggs)
+        groupby = [groupby] if isinstance(groupby, str) else groupby
+        
+        results = [self.read_group(domain, fields, groupby, lazy=lazy, model_name=model_name,
+                                   http_client=http_client) for domain in domains]
+        # <async-only>
+        results = await asyncio.gather(*results)
+        # </async-only>
+        
+        return _read_group_merge(results, aggs=aggs, groupby=groupby, lazy=lazy)
+        
+    async def name_get(self, ids: Union[int, List[int]], *,
+                       model_name: Optional[str] = None,
+                       http_client: Optional[T_AsyncHttpClient] = None) -> List[Tuple[int, str]]:
+        
+        ids = [ids] if isinstance(ids, int) else ids
+        
+        if self._name_cache is None:
+            data = await self.execute_kw(method='name_get',
                                          args=ids,
-                                         kwargs=execute_kwargs(fields=fields),
                                          model_name=model_name,
                                          http_client=http_client)
-            
-            return _fields_processor(data=data, fields=fields, getter_id=self.getter_id_fields)
+            return [tuple(r) for r in data]
+        
+        model_name = model_name if model_name else self.model_name
+        context = self.__context_key()
+        names = {i: self._name_cache.get(model_name, context, i) for i in ids}
+        unknown = [i for i, name in names.items() if name is None]
+        
+        for i in range(0, len(unknown), self._name_batch_size):
+            data = await self.execute_kw(method='name_get',
+                                         args=unknown[i:i + self._name_batch_size],
+                                         model_name=model_name,
+                                         http_client=http_client)
+            self._name_cache.put(model_name, context, data)
+            names.update(data)
+        
+        return [(i, names[i]) for i in ids if names[i] is not None]
+    
+    async def name_search(self, name: str = '', domain: Optional[T_Domain] = None, *,
+                          operator: str = 'ilike',
+                          limit: Optional[int] = 100,
+                          model_name: Optional[str] = None,
+                          http_client: Optional[T_AsyncHttpClient] = None) -> List[Tuple[int, str]]:
+        
+        kwargs = {'operator': operator, 'limit': limit}
+        if domain is not None:
+            kwargs['args'] = domain
+        
+        data = await self.execute_kw(method='name_search',
+                                     args=name,
+                                     kwargs=kwargs,
+                                     model_name=model_name,
+                                     http_client=http_client)
+        data = [tuple(r) for r in data]
         
+        if self._name_cache is not None:
+            self._name_cache.put(model_name if model_name else self.model_name, self.__context_key(), data)
+        
+        return data
+    
+    async def fields_get(self, *,
+                         attributes: Optional[List[str]] = None,
+                         model_name: Optional[str] = None,
+                         http_client: Optional[T_AsyncHttpClient] = None) -> Dict[str, dict]:
+        
+        return await self.execute_kw(method='fields_get',
+                                     args=[],
+                                     kwargs={'attributes': attributes} if attributes else None,
+                                     model_name=model_name,
+                                     http_client=http_client)
+    
     async def copy_data(self, id: Union[List[int], int], *,
                         default: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None,
                         model_name: Optional[str] = None,
@@ -173,6 +443,10 @@ class AsyncOdooRPC:
                     http_client: Optional[T_AsyncHttpClient] = None):
         
         ids = [ids] if isinstance(ids, int) else ids
+        if self._record_cache is not None:
+            self._record_cache.discard(model_name if model_name else self.model_name, ids)
+        if self._name_cache is not None:
+            self._name_cache.discard(model_name if model_name else self.model_name, ids)
         return await self.execute_kw(method='write',
                                      args=ids,
                                      kwargs={'vals': vals},
@@ -196,6 +470,116 @@ class AsyncOdooRPC:
         
         return {'db': self.database, 'uid': self.uid, 'password': self.password, 'obj': model_name}
     
+    async def __fields_processor(self, data: Optional[List[dict]], fields: Optional[List[str]]) -> List[dict]:
+        # <async-only>
+        if self._off_loop is not None and self.getter_id_fields is not None:
+            return await self._off_loop.process(_fields_processor, data, fields, self.getter_id_fields)
+        # </async-only>
+        return _fields_processor(data=data, fields=fields, getter_id=self.getter_id_fields)
+    
+    def __context_key(self) -> str:
+        return json.dumps([self.context, self.forced_context], sort_keys=True, default=str)
+    
+    async def __fields_meta(self, model_name: Optional[str], http_client: Optional[T_AsyncHttpClient]) -> Dict[str, dict]:
+        model_name = model_name if model_name else self.model_name
+        meta = self._fields_get_cache.get(model_name)
+        if meta is None:
+            meta = await self.fields_get(attributes=['type', 'store', 'relation', 'group_operator', 'aggregator'],
+                                         model_name=model_name,
+                                         http_client=http_client)
+            self._fields_get_cache[model_name] = meta
+        return meta
+    
+    async def __lean_fields(self, model_name: Optional[str], http_client: Optional[T_AsyncHttpClient]) -> List[str]:
+        model_name = model_name if model_name else self.model_name
+        meta = await self.__fields_meta(model_name, http_client)
+        
+        return _lean_fields(meta,
+                            allow=self._lean_projection['allow'].get(model_name, ()),
+                            deny=self._lean_projection['deny'].get(model_name, ()))
+    
+    async def __read_revalidated(self, ids: List[int], fields: Optional[List[str]],
+                                 model_name: Optional[str], http_client: Optional[T_AsyncHttpClient]) -> List[dict]:
+        model_name = model_name if model_name else self.model_name
+        
+        if 'write_date' not in await self.__fields_meta(model_name, http_client):
+            # models without log access (_log_access = False) cannot be revalidated
+            return await self.execute_kw(method='read',
+                                         args=ids,
+                                         kwargs=execute_kwargs(fields=fields),
+                                         model_name=model_name,
+                                         http_client=http_client)
+        
+        context = self.__context_key()
+        
+        cached = {}
+        for i in ids:
+            r = self._record_cache.get(model_name, context, i, fields)
+            if r is not None:
+                cached[i] = r
+        
+        current = dict()
+        if cached:
+            current = await self.execute_kw(method='search_read',
+                                            args=[['id', 'in', list(cached)]],
+                                            kwargs={'fields': ['write_date'],
+                                                    'context': {**(self.context or {}), 'active_test': False}},
+                                            model_name=model_name,
+                                            http_client=http_client)
+            current = {r['id']: r['write_date'] for r in current}
+            # cached records missing from the answer have been deleted
+            self._record_cache.discard(model_name, [i for i in cached if i not in current])
+        
+        records = {i: r for i, r in cached.items() if current.get(i) == r['write_date']}
+        to_read = [i for i in ids if i not in records and (i not in cached or i in current)]
+        
+        if to_read:
+            read_fields = fields + ['write_date'] if fields is not None and 'write_date' not in fields else fields
+            data = await self.execute_kw(method='read',
+                                         args=to_read,
+                                         kwargs=execute_kwargs(fields=read_fields),
+                                         model_name=model_name,
+                                         http_client=http_client)
+            self._record_cache.put(model_name, context, data, read_fields)
+            records.update((r['id'], r) for r in data)
+        
+        # callers (and _fields_processor) may change what they get, the cache keeps its own copy
+        if fields is None:
+            return [copy.deepcopy(records[i]) for i in ids if i in records]
+        return [copy.deepcopy({k: v for k, v in records[i].items() if k == 'id' or k in fields})
+                for i in ids if i in records]
+    
+    async def __seed_names(self, data: Optional[List[dict]], model_name: Optional[str],
+                           http_client: Optional[T_AsyncHttpClient]):
+        if not data:
+            return
+        meta = await self.__fields_meta(model_name, http_client)
+        context = self.__context_key()
+        for relation, names in _many2one_names(data, meta).items():
+            self._name_cache.put(relation, context, names)
+    
+    def __check_payload(self, size: int, model_name: str, method: str, kwargs: Optional[dict]):
+        if size <= self._large_payload_bytes:
+            return
+        self.metrics['large_payloads'] += 1
+        self.metrics['large_payload_bytes'] += size
+        
+        # only warn when the caller left fields=None, whether the lean projection picked them or not
+        if method not in ('search_read', 'read'):
+            return
+        fields = (kwargs or {}).get('fields')
+        if fields is None:
+            hint = 'Consider passing a list of fields.'
+        elif self._lean_projection is not None and model_name in self._fields_get_cache and \
+                fields == _lean_fields(self._fields_get_cache[model_name],
+                                       allow=self._lean_projection['allow'].get(model_name, ()),
+                                       deny=self._lean_projection['deny'].get(model_name, ())):
+            hint = 'Consider passing a list of fields or denying some in set_lean_projection.'
+        else:
+            return
+        warnings.warn(f'[aio-odoorpc] Warning: {model_name}.{method} returned a large payload '
+                      f'({size} bytes). {hint}')
+    
     async def login(self, *, http_client: Optional[T_AsyncHttpClient] = None, force: bool = False) -> Optional[int]:
         # If uid is already set, this method is a noop
         if not force and self.uid is not None:
@@ -215,15 +599,66 @@ class AsyncOdooRPC:
                          args: Optional[list] = tuple(),
                          kwargs: Optional[dict] = None, *,
                          model_name: Optional[str] = None,
+                         # <async-only>
+                         single_flight: bool = True,
+                         priority: Optional[str] = None,
+                         # </async-only>
                          http_client: Optional[T_AsyncHttpClient] = None):
         
+        kwargs = {} if kwargs is None else kwargs
         if self.forced_context or (self.context and 'context' not in kwargs):
             ctx = kwargs.get('context', self.context)
-            ctx = self.forced_context if ctx is None else ctx.update(self.forced_context or {})
+            ctx = self.forced_context if ctx is None else {**ctx, **(self.forced_context or {})}
             kwargs['context'] = ctx
         
-        return await execute_kw(*self.__base_args(http_client),
-                                **self.__base_kwargs(model_name),
+        base_args = self.__base_args(http_client)
+        base_kwargs = self.__base_kwargs(model_name)
+        
+        call = functools.partial(self.__execute_kw, base_args, base_kwargs, method, args, kwargs)
+        
+        # <async-only>
+        if self.scheduler is not None:
+            call = functools.partial(self.scheduler.run, priority if priority is not None else self.priority, call)
+        
+        if single_flight and self._single_flight is not None and method in READ_ONLY_METHODS:
+            http_client, url = base_args
+            key = single_flight_key(endpoint=url if url else id(http_client),
+                                    db=base_kwargs['db'],
+                                    uid=base_kwargs['uid'],
+                                    model_name=base_kwargs['obj'],
+                                    method=method,
+                                    args=args,
+                                    kwargs=kwargs)
+            call = functools.partial(self._single_flight.call, key, call)
+        # </async-only>
+        
+        return await call()
+    
+    async def __execute_kw(self, base_args: Tuple, base_kwargs: Dict[str, Any],
+                           method: str, args: Optional[list], kwargs: Optional[dict]):
+        http_client, url = base_args
+        # wrappers around the http client, any of them knows the size of the response body
+        wrappers = []
+        if self._compression is not None and not callable(http_client):
+            wrappers.append(AsyncCompressingHttpClient(http_client, url, self._compression))
+        elif self._large_payload_bytes is not None and not callable(http_client):
+            wrappers.append(AsyncMeasuringHttpClient(http_client, url))
+        # <async-only>
+        if self._off_loop is not None:
+            wrappers.append(AsyncOffLoopHttpClient(wrappers[-1] if wrappers else http_client, url, self._off_loop))
+        # </async-only>
+        if wrappers:
+            base_args = wrappers[-1], url
+        
+        data = await execute_kw(*base_args,
+                                **base_kwargs,
                                 method=method,
                                 args=args,
                                 kw=kwargs)
+        
+        if self._large_payload_bytes is not None:
+            sizes = [w.response_bytes for w in wrappers if w.response_bytes is not None]
+            if sizes:
+                self.__check_payload(sizes[0], base_kwargs['obj'], method, kwargs)
+        
+        return data
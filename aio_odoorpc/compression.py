@@ -0,0 +1,159 @@
+import gzip
+import json
+import time
+from collections import Counter
+from inspect import isawaitable
+from typing import Dict, Literal, Mapping, Optional, Tuple
+from aio_odoorpc_base.protocols import T_AsyncHttpClient, T_HttpClient
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+T_Encoding = Literal['gzip', 'zstd']
+
+
+class Compression:
+    """Settings and statistics shared by the compressing http clients.
+
+    Request bodies above 'threshold' bytes are compressed when 'compress_requests' is set. Only turn
+    it on when the server (or the proxy in front of it) accepts compressed request bodies, Odoo
+    itself does not. Responses are negotiated with 'Accept-Encoding: <encoding>, gzip'; the http
+    client decodes them, so only use zstd if yours can.
+
+    The threshold adjusts itself: compressing pays off when sending the saved bytes at
+    'bandwidth_bytes_per_s' would take longer than encoding. When it does the threshold is lowered
+    by 10%, otherwise it is doubled, always within [min_threshold, max_threshold]. So that a few
+    slow encodes do not turn compression off for good, one in 'probe_every' bodies between
+    min_threshold and the threshold is compressed as well; if that pays off the threshold comes
+    down to the size of that body.
+
+    Byte counts go to 'metrics': request_bytes_raw, request_bytes_sent, response_bytes_raw,
+    response_bytes_received (the latter only differs from raw when the server reports a
+    Content-Length for an encoded response) and compress_seconds."""
+
+    encoding: T_Encoding
+    compress_requests: bool
+    threshold: int
+    min_threshold: int
+    max_threshold: int
+    bandwidth_bytes_per_s: float
+    probe_every: int
+    accept_encoding: str
+    metrics: Counter
+
+    def __init__(self, *,
+                 encoding: T_Encoding = 'gzip',
+                 compress_requests: bool = False,
+                 threshold: int = 16 * 1024,
+                 min_threshold: int = 1024,
+                 max_threshold: int = 16 * 1024 * 1024,
+                 bandwidth_bytes_per_s: float = 10 * 1024 * 1024,
+                 probe_every: int = 32,
+                 metrics: Optional[Counter] = None):
+        if encoding not in ('gzip', 'zstd'):
+            raise RuntimeError(f'[aio-odoorpc] Error: unsupported encoding {encoding}.')
+        if encoding == 'zstd' and zstandard is None:
+            raise RuntimeError('[aio-odoorpc] Error: zstd compression requires the zstandard package.')
+        self.encoding = encoding
+        self.compress_requests = compress_requests
+        self.threshold = threshold
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.bandwidth_bytes_per_s = bandwidth_bytes_per_s
+        self.probe_every = probe_every
+        self.accept_encoding = ', '.join(dict.fromkeys((encoding, 'gzip')))
+        self.metrics = metrics if metrics is not None else Counter()
+        self._below_threshold = 0
+
+    def _compress(self, raw: bytes) -> bytes:
+        if self.encoding == 'zstd':
+            return zstandard.ZstdCompressor().compress(raw)
+        return gzip.compress(raw, compresslevel=6)
+
+    def encode(self, payload: Mapping) -> Tuple[bytes, Dict[str, str]]:
+        raw = json.dumps(payload).encode()
+        headers = {'Content-Type': 'application/json', 'Accept-Encoding': self.accept_encoding}
+        body = raw
+
+        probe = False
+        if self.compress_requests and self.min_threshold <= len(raw) < self.threshold:
+            self._below_threshold += 1
+            probe = self._below_threshold % self.probe_every == 0
+
+        if self.compress_requests and (probe or len(raw) >= self.threshold):
+            start = time.perf_counter()
+            compressed = self._compress(raw)
+            elapsed = time.perf_counter() - start
+            saved = len(raw) - len(compressed)
+            self.metrics['compress_seconds'] += elapsed
+
+            if saved / self.bandwidth_bytes_per_s > elapsed:
+                self.threshold = max(self.min_threshold,
+                                     len(raw) if probe else int(self.threshold * 0.9))
+            elif not probe:
+                self.threshold = min(self.max_threshold, self.threshold * 2)
+
+            if saved > 0:
+                body = compressed
+                headers['Content-Encoding'] = self.encoding
+
+        self.metrics['request_bytes_raw'] += len(raw)
+        self.metrics['request_bytes_sent'] += len(body)
+        return body, headers
+
+    def record_response(self, resp, content: bytes):
+        raw = len(content)
+        received = raw
+        if resp.headers.get('Content-Encoding') and resp.headers.get('Content-Length'):
+            received = int(resp.headers['Content-Length'])
+        self.metrics['response_bytes_raw'] += raw
+        self.metrics['response_bytes_received'] += received
+
+
+def _body_kwarg(http_client) -> str:
+    # httpx wants raw bytes in 'content', requests and aiohttp in 'data'
+    return 'content' if type(http_client).__module__.split('.')[0] == 'httpx' else 'data'
+
+
+class AsyncCompressingHttpClient:
+    """Callable http_client that posts the json-rpc payload through 'http_client' with compression."""
+
+    response_bytes: Optional[int] = None
+
+    def __init__(self, http_client: T_AsyncHttpClient, url: str, compression: Compression):
+        self.http_client = http_client
+        self.url = url
+        self.compression = compression
+
+    async def __call__(self, payload: Mapping):
+        body, headers = self.compression.encode(payload)
+        resp = await self.http_client.post(self.url, headers=headers, **{_body_kwarg(self.http_client): body})
+        content = getattr(resp, 'content', None)
+        if not isinstance(content, bytes):
+            # aiohttp
+            content = resp.read()
+            content = await content if isawaitable(content) else content
+        self.compression.record_response(resp, content)
+        self.response_bytes = len(content)
+        return resp
+
+
+class CompressingHttpClient:
+    """Callable http_client that posts the json-rpc payload through 'http_client' with compression."""
+
+    response_bytes: Optional[int] = None
+
+    def __init__(self, http_client: T_HttpClient, url: str, compression: Compression):
+        self.http_client = http_client
+        self.url = url
+        self.compression = compression
+
+    def __call__(self, payload: Mapping):
+        body, headers = self.compression.encode(payload)
+        resp = self.http_client.post(self.url, headers=headers, **{_body_kwarg(self.http_client): body})
+        self.compression.record_response(resp, resp.content)
+        self.response_bytes = len(resp.content)
+        return resp
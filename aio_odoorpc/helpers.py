@@ -1,10 +1,13 @@
-from typing import Any, Callable, Dict, Iterable, List, Literal, Tuple, Optional, Union
+from typing import Any, Callable, Collection, Dict, Iterable, List, Literal, Tuple, Optional, Union
 
 
 DEFAULT_SERVER_DATE_FORMAT: str = "%Y-%m-%d"
 DEFAULT_SERVER_TIME_FORMAT: str = "%H:%M:%S"
 DEFAULT_SERVER_DATETIME_FORMAT = f"{DEFAULT_SERVER_DATE_FORMAT} {DEFAULT_SERVER_TIME_FORMAT}"
 
+# Field types left out of lean projections as they may be arbitrarily large (images, attachments, rich text).
+HEAVY_FIELD_TYPES = ('binary', 'html')
+
 T_ID_FIELD = Union[Tuple[int, str], Literal[False], None]
 T_GETTER_ID = Callable[[T_ID_FIELD],
                        Optional[Union[Tuple[int, str],
@@ -35,6 +38,120 @@ def _fields_processor(data: Union[List[Dict[str, Any]], None],
     return data
 
 
+def _lean_fields(fields_meta: Dict[str, Dict[str, Any]],
+                 allow: Collection[str] = (),
+                 deny: Collection[str] = ()) -> List[str]:
+    # fields_meta is the result of fields_get with (at least) attributes 'type' and 'store'.
+    # Keeps stored fields that are not of a heavy type, plus those explicitly allowed, minus those denied.
+    return [name for name, meta in fields_meta.items()
+            if name not in deny
+            and (name in allow or (meta.get('store', True) and meta.get('type') not in HEAVY_FIELD_TYPES))]
+
+
+def _read_group_keys(groupby: List[str], lazy: bool) -> List[str]:
+    # Result rows are keyed by the groupby specs as given (e.g. 'date_order:month').
+    # In lazy mode Odoo only groups by the first one.
+    return groupby[:1] if lazy else list(groupby)
+
+
+def _read_group_flatten(data: List[Dict[str, Any]], groupby: List[str], lazy: bool) -> List[Dict[str, Any]]:
+    # Drops Odoo's internal keys ('__domain', '__context', '__fold', '__range') and always
+    # reports the number of records in the group as '__count', regardless of 'lazy'.
+    count_key = f"{groupby[0].split(':')[0]}_count" if lazy and groupby else '__count'
+    rows = []
+    for r in data:
+        row = {k: v for k, v in r.items() if not k.startswith('__') and k != count_key}
+        row['__count'] = r.get(count_key, 0)
+        rows.append(row)
+    return rows
+
+
+def _read_group_needs_meta(fields: List[str]) -> bool:
+    return any(':' not in f for f in fields)
+
+
+def _read_group_aggregators(fields: List[str],
+                            fields_meta: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Optional[str]]:
+    # fields are given as 'name', 'name:agg' or 'name:agg(field)'. Without an explicit aggregate
+    # Odoo uses the field's group_operator ('aggregator' since Odoo 17), taken from fields_meta;
+    # numeric fields default to 'sum', other fields are not aggregated (None).
+    aggs = {}
+    for f in fields:
+        name, _, spec = f.partition(':')
+        if spec:
+            aggs[name] = spec.split('(')[0]
+            continue
+        if fields_meta is None:
+            raise RuntimeError(f'[aio-odoorpc] Error: the aggregate of field {name} is unknown, '
+                               f'pass it as "{name}:<aggregate>".')
+        meta = fields_meta.get(name) or {}
+        agg = meta.get('aggregator') or meta.get('group_operator')
+        if agg is None and meta.get('type') in ('integer', 'float', 'monetary'):
+            agg = 'sum'
+        aggs[name] = agg
+    return aggs
+
+
+# Aggregates whose results over disjoint domains cannot be combined from the per-domain values,
+# e.g. count_distinct counts a partner present in two time buckets once in each.
+UNMERGEABLE_AGGREGATES = ('count_distinct', 'array_agg')
+
+
+def _read_group_check_mergeable(aggs: Dict[str, Optional[str]]):
+    for name, agg in aggs.items():
+        if agg in UNMERGEABLE_AGGREGATES:
+            raise RuntimeError(f'[aio-odoorpc] Error: aggregate {agg} of field {name} cannot be merged '
+                               f'across domains, use read_group instead.')
+
+
+def _read_group_merge(results: List[List[Dict[str, Any]]],
+                      aggs: Dict[str, Optional[str]],
+                      groupby: List[str],
+                      lazy: bool) -> List[Dict[str, Any]]:
+    # Merges flattened read_group results of the same grouping over disjoint domains, 'aggs' maps
+    # every field to its aggregate (see _read_group_aggregators). Rows with equal group values are
+    # combined: sum/count add up, min/max keep the extreme value, bool_and/bool_or are and-ed/or-ed
+    # and avg is weighted by the number of records of each row. That weight includes records whose
+    # value is NULL, which SQL's AVG skips, so merged averages are exact only for columns without
+    # NULLs; merge a 'name:sum' and a 'name:count' instead when that matters. Fields that are not
+    # aggregated keep the first value seen. See _read_group_check_mergeable for the aggregates that
+    # cannot be merged.
+    keys = _read_group_keys(groupby, lazy)
+    aggs = {k: v for k, v in aggs.items() if k not in keys and v is not None}
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    
+    for rows in results:
+        for r in rows:
+            # group values may already be formatted by a getter_id, e.g. as a dict
+            key = tuple(repr(r.get(k)) for k in keys)
+            m = merged.get(key)
+            if m is None:
+                merged[key] = dict(r)
+                continue
+            count = m['__count'] + r['__count']
+            for f, agg in aggs.items():
+                a, b = m.get(f), r.get(f)
+                if agg == 'bool_and':
+                    m[f] = bool(a) and bool(b)
+                elif agg == 'bool_or':
+                    m[f] = bool(a) or bool(b)
+                elif a is None or a is False:
+                    m[f] = b
+                elif b is None or b is False:
+                    pass
+                elif agg == 'max':
+                    m[f] = max(a, b)
+                elif agg == 'min':
+                    m[f] = min(a, b)
+                elif agg == 'avg':
+                    m[f] = (a * m['__count'] + b * r['__count']) / count if count else 0
+                else:
+                    m[f] = a + b
+            m['__count'] = count
+    
+    return list(merged.values())
+
+
 def getter_id_as_int(id_field: T_ID_FIELD) -> Optional[int]:
     if not id_field:
         return None
@@ -56,5 +173,3 @@ def getter_id_as_dict(id_field: T_ID_FIELD) -> Optional[Dict[str, int]]:
 
 def getter_id_as_list_of_dict(id_field: T_ID_FIELD) -> Optional[List[Dict[str, int]]]:
     return [getter_id_as_dict(id_field)] if id_field else None
-
-
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+T_NameKey = Tuple[str, str, int]
+
+
+class NameCache:
+    """LRU of display names, keyed by (model, context, id).
+
+    The contexts each (model, id) is cached under are indexed, so discarding ids does not scan the cache."""
+
+    max_entries: int
+    _names: 'OrderedDict[T_NameKey, str]'
+    _contexts: Dict[Tuple[str, int], Set[str]]
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._names = OrderedDict()
+        self._contexts = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def get(self, model_name: str, context: str, id: int) -> Optional[str]:
+        name = self._names.get((model_name, context, id))
+        if name is not None:
+            self._names.move_to_end((model_name, context, id))
+        return name
+
+    def put(self, model_name: str, context: str, names: Iterable[Tuple[int, str]]):
+        for id, name in names:
+            key = (model_name, context, id)
+            self._names[key] = name
+            self._names.move_to_end(key)
+            self._contexts.setdefault((model_name, id), set()).add(context)
+        while len(self._names) > self.max_entries:
+            self._unindex(self._names.popitem(last=False)[0])
+
+    def discard(self, model_name: str, ids: Iterable[int]):
+        for id in ids:
+            for context in self._contexts.pop((model_name, id), ()):
+                del self._names[(model_name, context, id)]
+
+    def _unindex(self, key: T_NameKey):
+        model_name, context, id = key
+        contexts = self._contexts[(model_name, id)]
+        contexts.discard(context)
+        if not contexts:
+            del self._contexts[(model_name, id)]
+
+
+def _many2one_names(data: List[dict], fields_meta: Dict[str, dict]) -> Dict[str, List[Tuple[int, str]]]:
+    # Collects the (id, display name) pairs of the many2one fields of search_read/read results,
+    # grouped by the related model.
+    names: Dict[str, List[Tuple[int, str]]] = {}
+    if not data:
+        return names
+    for f in data[0]:
+        meta = fields_meta.get(f)
+        if not meta or meta.get('type') != 'many2one' or not meta.get('relation'):
+            continue
+        pairs = names.setdefault(meta['relation'], [])
+        for r in data:
+            v = r.get(f)
+            if isinstance(v, (list, tuple)) and len(v) == 2:
+                pairs.append((v[0], v[1]))
+    return names
@@ -1,8 +1,18 @@
+from collections import Counter
+import copy
+import functools
+import json
+import warnings
 from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 from aio_odoorpc_base.helpers import execute_kwargs
 from aio_odoorpc_base.sync import execute_kw, login
 from aio_odoorpc_base.protocols import T_HttpClient
-from .helpers import _fields_processor
+from .compression import CompressingHttpClient, Compression, T_Encoding
+from .name_cache import NameCache, _many2one_names
+from .record_cache import RecordCache
+from .transport import MeasuringHttpClient
+from .helpers import _fields_processor, _lean_fields, _read_group_aggregators, _read_group_check_mergeable, \
+    _read_group_flatten, _read_group_keys, _read_group_merge, _read_group_needs_meta
 from aio_odoorpc import helpers
 
 # Domain operators.
@@ -27,6 +37,14 @@ class OdooRPC:
     getter_id_fields: Optional[helpers.T_GETTER_ID] = None
     _context: Optional[dict] = None
     _forced_context: Optional[dict] = None
+    metrics: Counter
+    _fields_get_cache: Dict[str, Dict[str, dict]]
+    _lean_projection: Optional[Dict[str, Dict[str, List[str]]]] = None
+    _large_payload_bytes: Optional[int] = None
+    _compression: Optional[Compression] = None
+    _record_cache: Optional[RecordCache] = None
+    _name_cache: Optional[NameCache] = None
+    _name_batch_size: int = 1000
 
     def __init__(self, *,
                  database: str,
@@ -44,6 +62,8 @@ class OdooRPC:
         self.http_client = http_client
         self.url = url_jsonrpc_endpoint if url_jsonrpc_endpoint is not None else ''
         self.model_name = default_model_name
+        self.metrics = Counter()
+        self._fields_get_cache = dict()
 
     def __copy__(self):
         username_or_uid = self.uid if self.uid else self.username
@@ -51,6 +71,14 @@ class OdooRPC:
                          password=self.password, http_client=self.http_client,
                          url_jsonrpc_endpoint=self.url, default_model_name=self.model_name)
         new.username = self.username
+        new.metrics = self.metrics
+        new._fields_get_cache = self._fields_get_cache
+        new._lean_projection = self._lean_projection
+        new._large_payload_bytes = self._large_payload_bytes
+        new._compression = self._compression
+        new._record_cache = self._record_cache
+        new._name_cache = self._name_cache
+        new._name_batch_size = self._name_batch_size
         return new
 
     def new_for_model(self, default_model_name: str):
@@ -88,6 +116,55 @@ class OdooRPC:
 
         self.getter_id_fields = opts[fmt]
 
+    def set_lean_projection(self, enabled: bool = True, *,
+                            allow: Optional[Dict[str, List[str]]] = None,
+                            deny: Optional[Dict[str, List[str]]] = None,
+                            large_payload_bytes: Optional[int] = None):
+        # When enabled, search_read and read invoked with fields=None fetch only the stored fields
+        # that are neither binary nor html instead of every field. The list of fields comes from
+        # fields_get and is cached per model. 'allow' and 'deny' map a model name to fields that are
+        # always/never fetched. Response bodies larger than 'large_payload_bytes' are counted in
+        # metrics ('large_payloads', 'large_payload_bytes'); those of search_read and read called with
+        # fields=None also raise a warning. The size is taken from the http response, so it is not
+        # measured for callable http clients.
+        self._lean_projection = {'allow': allow or {},
+                                 'deny': deny or {}} if enabled else None
+        self._large_payload_bytes = large_payload_bytes
+
+    def set_compression(self, enabled: bool = True, *,
+                        encoding: T_Encoding = 'gzip',
+                        compress_requests: bool = False,
+                        threshold: int = 16 * 1024,
+                        bandwidth_bytes_per_s: float = 10 * 1024 * 1024):
+        # When enabled, requests are posted by a compressing wrapper around the http client that asks
+        # for compressed responses and, with compress_requests=True (only if the server accepts it),
+        # gzip/zstd compresses request bodies above an adaptive threshold. Raw versus compressed
+        # byte counts go to metrics. See aio_odoorpc.compression.Compression for details.
+        # Callable http clients are used as they are.
+        self._compression = Compression(encoding=encoding,
+                                        compress_requests=compress_requests,
+                                        threshold=threshold,
+                                        bandwidth_bytes_per_s=bandwidth_bytes_per_s,
+                                        metrics=self.metrics) if enabled else None
+
+    def set_record_cache(self, enabled: bool = True, *, max_records: int = 10000):
+        # When enabled, records fetched with 'read' are kept in an LRU cache (per model and context).
+        # Before being served again, cached records are revalidated with one search_read of their
+        # 'write_date' and only the records that changed since are read again. Odoo's write_date has
+        # a resolution of one second, records written through this object are dropped from the cache.
+        # Models without a write_date (_log_access = False) are read as usual, without caching.
+        self._record_cache = RecordCache(
+            max_records=max_records) if enabled else None
+
+    def set_name_cache(self, enabled: bool = True, *, max_entries: int = 100000, batch_size: int = 1000):
+        # When enabled, name_get and name_search keep display names in an LRU cache (per model and
+        # context), also fed by the many2one (id, name) pairs of search_read and read results (this
+        # needs fields_get, fetched once per model). name_get only asks the server for unknown ids,
+        # batch_size ids per call. Records renamed through this object are dropped from the cache.
+        self._name_cache = NameCache(
+            max_entries=max_entries) if enabled else None
+        self._name_batch_size = batch_size
+
     def search(self, domain: Optional[T_Domain] = None, *,
                offset: Optional[int] = None,
                limit: Optional[int] = None,
@@ -120,6 +197,9 @@ class OdooRPC:
                     model_name: Optional[str] = None,
                     http_client: Optional[T_HttpClient] = None) -> List[dict]:
 
+        if fields is None and self._lean_projection is not None:
+            fields = self.__lean_fields(model_name, http_client)
+
         data = self.execute_kw(method='search_read',
                                args=domain,
                                kwargs=execute_kwargs(
@@ -127,7 +207,10 @@ class OdooRPC:
                                model_name=model_name,
                                http_client=http_client)
 
-        return _fields_processor(data=data, fields=fields, getter_id=self.getter_id_fields)
+        if self._name_cache is not None:
+            self.__seed_names(data, model_name, http_client)
+
+        return self.__fields_processor(data, fields)
 
     def read(self, ids: Union[int, List[int]], *,
              fields: Optional[List[str]] = None,
@@ -150,13 +233,136 @@ class OdooRPC:
                 limit = min(limit, len(ids))
                 ids = ids[:limit - 1]
 
-            data = self.execute_kw(method='read',
+            if fields is None and self._lean_projection is not None:
+                fields = self.__lean_fields(model_name, http_client)
+
+            if self._record_cache is not None:
+                data = self.__read_revalidated(
+                    ids, fields, model_name, http_client)
+            else:
+                data = self.execute_kw(method='read',
+                                       args=ids,
+                                       kwargs=execute_kwargs(fields=fields),
+                                       model_name=model_name,
+                                       http_client=http_client)
+
+            if self._name_cache is not None:
+                self.__seed_names(data, model_name, http_client)
+
+            return self.__fields_processor(data, fields)
+
+    def read_group(self, domain: Optional[T_Domain], fields: List[str], groupby: Union[str, List[str]], *,
+                   offset: Optional[int] = None,
+                   limit: Optional[int] = None,
+                   orderby: Optional[str] = None,
+                   lazy: bool = True,
+                   flatten: bool = True,
+                   model_name: Optional[str] = None,
+                   http_client: Optional[T_HttpClient] = None) -> List[dict]:
+        # Aggregation runs on the Odoo server, only one row per group travels over the wire.
+        # With flatten=True Odoo's internal keys ('__domain', '__context', '__fold', '__range')
+        # are dropped and the record count of every group is always found under '__count'.
+        groupby = [groupby] if isinstance(groupby, str) else groupby
+
+        kwargs = execute_kwargs(fields=fields, offset=offset, limit=limit)
+        kwargs.update({'groupby': groupby, 'lazy': lazy})
+        if orderby is not None:
+            kwargs['orderby'] = orderby
+
+        data = self.execute_kw(method='read_group',
+                               args=domain if domain is not None else [],
+                               kwargs=kwargs,
+                               model_name=model_name,
+                               http_client=http_client)
+
+        if flatten:
+            data = _read_group_flatten(data, groupby=groupby, lazy=lazy)
+
+        return self.__fields_processor(data, _read_group_keys(groupby, lazy))
+
+    def read_group_merged(self, domains: List[T_Domain], fields: List[str], groupby: Union[str, List[str]], *,
+                          lazy: bool = True,
+                          model_name: Optional[str] = None,
+                          http_client: Optional[T_HttpClient] = None) -> List[dict]:
+        # Runs the same read_group over each of the (disjoint) domains, concurrently when async,
+        # and merges rows of equal group values. Useful to split one large aggregation in time buckets
+        # (e.g. one domain per month). Aggregates are merged according to the 'name:agg' spec in fields
+        # or, for fields given without one, to the field's group_operator as found by fields_get (cached
+        # per model). count_distinct and array_agg cannot be merged and raise a RuntimeError. Averages
+        # are weighted by the record count of each row, which is exact only for columns without NULLs.
+        fields_meta = self.__fields_meta(
+            model_name, http_client) if _read_group_needs_meta(fields) else None
+        aggs = _read_group_aggregators(fields, fields_meta)
+        _read_group_check_mergeable(aggs)
+        groupby = [groupby] if isinstance(groupby, str) else groupby
+
+        results = [self.read_group(domain, fields, groupby, lazy=lazy, model_name=model_name,
+                                   http_client=http_client) for domain in domains]
+
+        return _read_group_merge(results, aggs=aggs, groupby=groupby, lazy=lazy)
+
+    def name_get(self, ids: Union[int, List[int]], *,
+                 model_name: Optional[str] = None,
+                 http_client: Optional[T_HttpClient] = None) -> List[Tuple[int, str]]:
+
+        ids = [ids] if isinstance(ids, int) else ids
+
+        if self._name_cache is None:
+            data = self.execute_kw(method='name_get',
                                    args=ids,
-                                   kwargs=execute_kwargs(fields=fields),
                                    model_name=model_name,
                                    http_client=http_client)
+            return [tuple(r) for r in data]
+
+        model_name = model_name if model_name else self.model_name
+        context = self.__context_key()
+        names = {i: self._name_cache.get(model_name, context, i) for i in ids}
+        unknown = [i for i, name in names.items() if name is None]
+
+        for i in range(0, len(unknown), self._name_batch_size):
+            data = self.execute_kw(method='name_get',
+                                   args=unknown[i:i + self._name_batch_size],
+                                   model_name=model_name,
+                                   http_client=http_client)
+            self._name_cache.put(model_name, context, data)
+            names.update(data)
+
+        return [(i, names[i]) for i in ids if names[i] is not None]
+
+    def name_search(self, name: str = '', domain: Optional[T_Domain] = None, *,
+                    operator: str = 'ilike',
+                    limit: Optional[int] = 100,
+                    model_name: Optional[str] = None,
+                    http_client: Optional[T_HttpClient] = None) -> List[Tuple[int, str]]:
+
+        kwargs = {'operator': operator, 'limit': limit}
+        if domain is not None:
+            kwargs['args'] = domain
+
+        data = self.execute_kw(method='name_search',
+                               args=name,
+                               kwargs=kwargs,
+                               model_name=model_name,
+                               http_client=http_client)
+        data = [tuple(r) for r in data]
 
-            return _fields_processor(data=data, fields=fields, getter_id=self.getter_id_fields)
+        if self._name_cache is not None:
+            self._name_cache.put(
+                model_name if model_name else self.model_name, self.__context_key(), data)
+
+        return data
+
+    def fields_get(self, *,
+                   attributes: Optional[List[str]] = None,
+                   model_name: Optional[str] = None,
+                   http_client: Optional[T_HttpClient] = None) -> Dict[str, dict]:
+
+        return self.execute_kw(method='fields_get',
+                               args=[],
+                               kwargs={
+                                   'attributes': attributes} if attributes else None,
+                               model_name=model_name,
+                               http_client=http_client)
 
     def copy_data(self, id: Union[List[int], int], *,
                   default: Optional[Union[Dict[str, Any],
@@ -177,6 +383,12 @@ class OdooRPC:
               http_client: Optional[T_HttpClient] = None):
 
         ids = [ids] if isinstance(ids, int) else ids
+        if self._record_cache is not None:
+            self._record_cache.discard(
+                model_name if model_name else self.model_name, ids)
+        if self._name_cache is not None:
+            self._name_cache.discard(
+                model_name if model_name else self.model_name, ids)
         return self.execute_kw(method='write',
                                args=ids,
                                kwargs={'vals': vals},
@@ -202,6 +414,118 @@ class OdooRPC:
 
         return {'db': self.database, 'uid': self.uid, 'password': self.password, 'obj': model_name}
 
+    def __fields_processor(self, data: Optional[List[dict]], fields: Optional[List[str]]) -> List[dict]:
+        return _fields_processor(data=data, fields=fields, getter_id=self.getter_id_fields)
+
+    def __context_key(self) -> str:
+        return json.dumps([self.context, self.forced_context], sort_keys=True, default=str)
+
+    def __fields_meta(self, model_name: Optional[str], http_client: Optional[T_HttpClient]) -> Dict[str, dict]:
+        model_name = model_name if model_name else self.model_name
+        meta = self._fields_get_cache.get(model_name)
+        if meta is None:
+            meta = self.fields_get(attributes=['type', 'store', 'relation', 'group_operator', 'aggregator'],
+                                   model_name=model_name,
+                                   http_client=http_client)
+            self._fields_get_cache[model_name] = meta
+        return meta
+
+    def __lean_fields(self, model_name: Optional[str], http_client: Optional[T_HttpClient]) -> List[str]:
+        model_name = model_name if model_name else self.model_name
+        meta = self.__fields_meta(model_name, http_client)
+
+        return _lean_fields(meta,
+                            allow=self._lean_projection['allow'].get(
+                                model_name, ()),
+                            deny=self._lean_projection['deny'].get(model_name, ()))
+
+    def __read_revalidated(self, ids: List[int], fields: Optional[List[str]],
+                           model_name: Optional[str], http_client: Optional[T_HttpClient]) -> List[dict]:
+        model_name = model_name if model_name else self.model_name
+
+        if 'write_date' not in self.__fields_meta(model_name, http_client):
+            # models without log access (_log_access = False) cannot be revalidated
+            return self.execute_kw(method='read',
+                                   args=ids,
+                                   kwargs=execute_kwargs(fields=fields),
+                                   model_name=model_name,
+                                   http_client=http_client)
+
+        context = self.__context_key()
+
+        cached = {}
+        for i in ids:
+            r = self._record_cache.get(model_name, context, i, fields)
+            if r is not None:
+                cached[i] = r
+
+        current = dict()
+        if cached:
+            current = self.execute_kw(method='search_read',
+                                      args=[['id', 'in', list(cached)]],
+                                      kwargs={'fields': ['write_date'],
+                                              'context': {**(self.context or {}), 'active_test': False}},
+                                      model_name=model_name,
+                                      http_client=http_client)
+            current = {r['id']: r['write_date'] for r in current}
+            # cached records missing from the answer have been deleted
+            self._record_cache.discard(
+                model_name, [i for i in cached if i not in current])
+
+        records = {i: r for i, r in cached.items() if current.get(i)
+                   == r['write_date']}
+        to_read = [i for i in ids if i not in records and (
+            i not in cached or i in current)]
+
+        if to_read:
+            read_fields = fields + \
+                ['write_date'] if fields is not None and 'write_date' not in fields else fields
+            data = self.execute_kw(method='read',
+                                   args=to_read,
+                                   kwargs=execute_kwargs(fields=read_fields),
+                                   model_name=model_name,
+                                   http_client=http_client)
+            self._record_cache.put(model_name, context, data, read_fields)
+            records.update((r['id'], r) for r in data)
+
+        # callers (and _fields_processor) may change what they get, the cache keeps its own copy
+        if fields is None:
+            return [copy.deepcopy(records[i]) for i in ids if i in records]
+        return [copy.deepcopy({k: v for k, v in records[i].items() if k == 'id' or k in fields})
+                for i in ids if i in records]
+
+    def __seed_names(self, data: Optional[List[dict]], model_name: Optional[str],
+                     http_client: Optional[T_HttpClient]):
+        if not data:
+            return
+        meta = self.__fields_meta(model_name, http_client)
+        context = self.__context_key()
+        for relation, names in _many2one_names(data, meta).items():
+            self._name_cache.put(relation, context, names)
+
+    def __check_payload(self, size: int, model_name: str, method: str, kwargs: Optional[dict]):
+        if size <= self._large_payload_bytes:
+            return
+        self.metrics['large_payloads'] += 1
+        self.metrics['large_payload_bytes'] += size
+
+        # only warn when the caller left fields=None, whether the lean projection picked them or not
+        if method not in ('search_read', 'read'):
+            return
+        fields = (kwargs or {}).get('fields')
+        if fields is None:
+            hint = 'Consider passing a list of fields.'
+        elif self._lean_projection is not None and model_name in self._fields_get_cache and \
+                fields == _lean_fields(self._fields_get_cache[model_name],
+                                       allow=self._lean_projection['allow'].get(
+                                           model_name, ()),
+                                       deny=self._lean_projection['deny'].get(model_name, ())):
+            hint = 'Consider passing a list of fields or denying some in set_lean_projection.'
+        else:
+            return
+        warnings.warn(f'[aio-odoorpc] Warning: {model_name}.{method} returned a large payload '
+                      f'({size} bytes). {hint}')
+
     def login(self, *, http_client: Optional[T_HttpClient] = None, force: bool = False) -> Optional[int]:
         # If uid is already set, this method is a noop
         if not force and self.uid is not None:
@@ -224,14 +548,45 @@ class OdooRPC:
                    model_name: Optional[str] = None,
                    http_client: Optional[T_HttpClient] = None):
 
+        kwargs = {} if kwargs is None else kwargs
         if self.forced_context or (self.context and 'context' not in kwargs):
             ctx = kwargs.get('context', self.context)
-            ctx = self.forced_context if ctx is None else ctx.update(
-                self.forced_context or {})
+            ctx = self.forced_context if ctx is None else {
+                **ctx, **(self.forced_context or {})}
             kwargs['context'] = ctx
 
-        return execute_kw(*self.__base_args(http_client),
-                          **self.__base_kwargs(model_name),
+        base_args = self.__base_args(http_client)
+        base_kwargs = self.__base_kwargs(model_name)
+
+        call = functools.partial(
+            self.__execute_kw, base_args, base_kwargs, method, args, kwargs)
+
+        return call()
+
+    def __execute_kw(self, base_args: Tuple, base_kwargs: Dict[str, Any],
+                     method: str, args: Optional[list], kwargs: Optional[dict]):
+        http_client, url = base_args
+        # wrappers around the http client, any of them knows the size of the response body
+        wrappers = []
+        if self._compression is not None and not callable(http_client):
+            wrappers.append(CompressingHttpClient(
+                http_client, url, self._compression))
+        elif self._large_payload_bytes is not None and not callable(http_client):
+            wrappers.append(MeasuringHttpClient(http_client, url))
+        if wrappers:
+            base_args = wrappers[-1], url
+
+        data = execute_kw(*base_args,
+                          **base_kwargs,
                           method=method,
                           args=args,
                           kw=kwargs)
+
+        if self._large_payload_bytes is not None:
+            sizes = [
+                w.response_bytes for w in wrappers if w.response_bytes is not None]
+            if sizes:
+                self.__check_payload(
+                    sizes[0], base_kwargs['obj'], method, kwargs)
+
+        return data
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import re
+from collections import Counter
+from typing import Any, Callable, List, Mapping, Optional, Tuple
+from aio_odoorpc_base.protocols import T_AsyncHttpClient
+from .transport import _JsonResponse
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+class _ChunkedDecoder:
+    # Decodes a json document while handing control back to the event loop. The outer value and
+    # the arrays/objects directly within it (the 'result' of a json-rpc response) are walked here,
+    # their elements are decoded by json's own scanner one at a time. The loop gets control back
+    # each time another 'chunk_bytes' of the document have been decoded.
+
+    def __init__(self, text: str, chunk_bytes: int):
+        self.text = text
+        self.chunk_bytes = chunk_bytes
+        self.yielded_at = 0
+        self.yields = 0
+
+    def _skip(self, idx: int) -> int:
+        return _WHITESPACE.match(self.text, idx).end()
+
+    def _expect(self, char: str, idx: int, msg: str):
+        if not self.text.startswith(char, idx):
+            raise json.JSONDecodeError(msg, self.text, idx)
+
+    async def decode(self) -> Any:
+        value, idx = await self._value(self._skip(0), 2)
+        if self._skip(idx) != len(self.text):
+            raise json.JSONDecodeError('Extra data', self.text, idx)
+        return value
+
+    async def _value(self, idx: int, depth: int) -> Tuple[Any, int]:
+        char = self.text[idx:idx + 1]
+        if depth == 0 or char not in ('[', '{'):
+            value, idx = _DECODER.raw_decode(self.text, idx)
+            if idx - self.yielded_at >= self.chunk_bytes:
+                self.yielded_at = idx
+                self.yields += 1
+                await asyncio.sleep(0)
+            return value, idx
+
+        close = ']' if char == '[' else '}'
+        container = [] if char == '[' else {}
+        idx = self._skip(idx + 1)
+        if self.text.startswith(close, idx):
+            return container, idx + 1
+
+        while True:
+            if char == '{':
+                self._expect('"', idx, 'Expecting property name enclosed in double quotes')
+                key, idx = _DECODER.raw_decode(self.text, idx)
+                idx = self._skip(idx)
+                self._expect(':', idx, "Expecting ':' delimiter")
+                container[key], idx = await self._value(self._skip(idx + 1), depth - 1)
+            else:
+                value, idx = await self._value(idx, depth - 1)
+                container.append(value)
+            idx = self._skip(idx)
+            if self.text.startswith(close, idx):
+                return container, idx + 1
+            self._expect(',', idx, "Expecting ',' delimiter")
+            idx = self._skip(idx + 1)
+
+
+class OffLoop:
+    """Settings for keeping the decoding of large responses from blocking the event loop.
+
+    json.loads holds the GIL for as long as it decodes, so neither a thread pool nor a process pool
+    (whose results are unpickled under the GIL again) frees the loop. Instead, response bodies of at
+    least 'threshold_bytes' are decoded a record at a time on the loop itself, which gets control
+    back after every 'chunk_bytes' decoded. Likewise, results of at least 'threshold_rows' rows are
+    post-processed (id fields formatting) 'chunk_rows' rows at a time. The longest stall is then
+    about the time it takes to decode 'chunk_bytes', at the cost of some extra decoding time, apart
+    from garbage collection runs over the many new objects, as with json.loads.
+
+    Counts go to metrics: off_loop_decodes, off_loop_decoded_bytes, off_loop_yields, on_loop_decodes
+    and off_loop_post_processing."""
+
+    threshold_bytes: int
+    threshold_rows: int
+    chunk_bytes: int
+    chunk_rows: int
+    metrics: Counter
+
+    def __init__(self, *,
+                 threshold_bytes: int = 1024 * 1024,
+                 threshold_rows: int = 5000,
+                 chunk_bytes: int = 256 * 1024,
+                 chunk_rows: int = 1000,
+                 metrics: Optional[Counter] = None):
+        self.threshold_bytes = threshold_bytes
+        self.threshold_rows = threshold_rows
+        self.chunk_bytes = chunk_bytes
+        self.chunk_rows = chunk_rows
+        self.metrics = metrics if metrics is not None else Counter()
+
+    async def decode(self, body: bytes) -> Any:
+        if len(body) < self.threshold_bytes:
+            self.metrics['on_loop_decodes'] += 1
+            return json.loads(body)
+        self.metrics['off_loop_decodes'] += 1
+        self.metrics['off_loop_decoded_bytes'] += len(body)
+        decoder = _ChunkedDecoder(body.decode('utf-8-sig'), self.chunk_bytes)
+        try:
+            return await decoder.decode()
+        finally:
+            self.metrics['off_loop_yields'] += decoder.yields
+
+    async def process(self, func: Callable[..., List], data: Any, *args) -> Any:
+        # 'func' must process a list of rows independently of the others, as _fields_processor does
+        if not data or len(data) < self.threshold_rows:
+            return func(data, *args)
+        self.metrics['off_loop_post_processing'] += 1
+        result = []
+        for i in range(0, len(data), self.chunk_rows):
+            result.extend(func(data[i:i + self.chunk_rows], *args))
+            await asyncio.sleep(0)
+        return result
+
+
+class AsyncOffLoopHttpClient:
+    """Callable http_client that reads the raw response of 'http_client' and decodes it with OffLoop.
+
+    Responses that do not expose their raw body (e.g. from other callable clients) are returned as they are."""
+
+    response_bytes: Optional[int] = None
+
+    def __init__(self, http_client: T_AsyncHttpClient, url: str, off_loop: OffLoop):
+        self.http_client = http_client
+        self.url = url
+        self.off_loop = off_loop
+
+    async def __call__(self, payload: Mapping):
+        if callable(self.http_client):
+            resp = await self.http_client(payload)
+        else:
+            resp = await self.http_client.post(self.url, json=payload)
+
+        body = getattr(resp, 'content', None)
+        if not isinstance(body, bytes):
+            if not hasattr(resp, 'read'):
+                return resp
+            # aiohttp
+            body = await resp.read()
+
+        self.response_bytes = len(body)
+        return _JsonResponse(await self.off_loop.decode(body))
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+T_RecordKey = Tuple[str, str, int]
+
+
+class RecordCache:
+    """LRU of records read through 'read', keyed by (model, context, id).
+
+    Every entry keeps the record's write_date and the set of fields it was read with
+    (None meaning all fields), a cached record only serves reads of a subset of its fields.
+    The contexts each (model, id) is cached under are indexed, so discarding ids does not scan the cache."""
+
+    max_records: int
+    _records: 'OrderedDict[T_RecordKey, Tuple[Optional[FrozenSet[str]], Dict[str, Any]]]'
+    _contexts: Dict[Tuple[str, int], Set[str]]
+
+    def __init__(self, max_records: int = 10000):
+        self.max_records = max_records
+        self._records = OrderedDict()
+        self._contexts = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, model_name: str, context: str, id: int,
+            fields: Optional[Iterable[str]]) -> Optional[Dict[str, Any]]:
+        entry = self._records.get((model_name, context, id))
+        if entry is None:
+            return None
+        cached_fields, record = entry
+        if cached_fields is not None and (fields is None or not cached_fields.issuperset(fields)):
+            return None
+        self._records.move_to_end((model_name, context, id))
+        return record
+
+    def put(self, model_name: str, context: str, records: List[Dict[str, Any]], fields: Optional[Iterable[str]]):
+        fields = frozenset(fields) if fields is not None else None
+        for r in records:
+            key = (model_name, context, r['id'])
+            self._records[key] = (fields, r)
+            self._records.move_to_end(key)
+            self._contexts.setdefault((model_name, r['id']), set()).add(context)
+        while len(self._records) > self.max_records:
+            self._unindex(self._records.popitem(last=False)[0])
+
+    def discard(self, model_name: str, ids: Iterable[int]):
+        for id in ids:
+            for context in self._contexts.pop((model_name, id), ()):
+                del self._records[(model_name, context, id)]
+
+    def _unindex(self, key: T_RecordKey):
+        model_name, context, id = key
+        contexts = self._contexts[(model_name, id)]
+        contexts.discard(context)
+        if not contexts:
+            del self._contexts[(model_name, id)]
@@ -0,0 +1,133 @@
+import asyncio
+import gzip
+import json
+import time
+from collections import defaultdict, deque
+from inspect import isawaitable
+from typing import Any, Deque, Dict, List, Mapping
+from aio_odoorpc_base.protocols import T_AsyncHttpClient, T_HttpClient
+from .transport import _JsonResponse
+
+
+# Record-and-replay transports, usable as the http_client of AsyncOdooRPC/OdooRPC.
+#
+# The recording clients pass every json-rpc call on to a real http client and append the answer,
+# with its latency, to a gzipped json-lines file. The replay clients serve those answers back
+# without any server. Requests are matched by model, method and normalized args (db, uid and
+# password are ignored and never written to the file). When the same request was recorded several
+# times its answers are served in turn.
+
+
+def match_key(payload: Mapping) -> str:
+    params = payload['params']
+    service, method, args = params['service'], params['method'], params.get('args') or []
+    if service == 'object' and method == 'execute_kw':
+        # args: db, uid, password, model, method, [args], kwargs (optional)
+        args = args[3:]
+    else:
+        # args of the other services are credentials or server administration
+        args = []
+    return json.dumps([service, method, args], sort_keys=True, separators=(',', ':'), default=str)
+
+
+class _Recorder:
+    def __init__(self, path: str):
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+
+    def record(self, payload: Mapping, data: Mapping, latency: float):
+        answer = {k: v for k, v in data.items() if k in ('result', 'error')}
+        self._file.write(json.dumps({'key': match_key(payload), 'latency': latency, 'answer': answer},
+                                    separators=(',', ':')))
+        self._file.write('\n')
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncRecordingHttpClient(_Recorder):
+    def __init__(self, http_client: T_AsyncHttpClient, path: str, url: str = ''):
+        super().__init__(path)
+        self.http_client = http_client
+        self.url = url
+
+    async def __call__(self, payload: Mapping) -> _JsonResponse:
+        start = time.perf_counter()
+        if callable(self.http_client):
+            resp = await self.http_client(payload)
+        else:
+            resp = await self.http_client.post(self.url, json=payload)
+        data = resp.json()
+        data = await data if isawaitable(data) else data
+        self.record(payload, data, time.perf_counter() - start)
+        return _JsonResponse(data)
+
+
+class RecordingHttpClient(_Recorder):
+    def __init__(self, http_client: T_HttpClient, path: str, url: str = ''):
+        super().__init__(path)
+        self.http_client = http_client
+        self.url = url
+
+    def __call__(self, payload: Mapping) -> _JsonResponse:
+        start = time.perf_counter()
+        if callable(self.http_client):
+            resp = self.http_client(payload)
+        else:
+            resp = self.http_client.post(self.url, json=payload)
+        data = resp.json()
+        self.record(payload, data, time.perf_counter() - start)
+        return _JsonResponse(data)
+
+
+class _Replayer:
+    """'realtime=True' waits each answer's recorded latency, 'realtime=False' answers at once."""
+
+    realtime: bool
+    latencies: List[float]
+
+    def __init__(self, path: str, *, realtime: bool = True):
+        self.realtime = realtime
+        self.latencies = []
+        self._answers: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._pending: Dict[str, Deque[Dict[str, Any]]] = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            for line in file:
+                rec = json.loads(line)
+                self._answers[rec['key']].append(rec)
+                self.latencies.append(rec['latency'])
+
+    def __len__(self) -> int:
+        return len(self.latencies)
+
+    def _next(self, payload: Mapping):
+        key = match_key(payload)
+        if key not in self._answers:
+            raise RuntimeError(f'[aio-odoorpc] Error: no recorded answer for request {key}.')
+        pending = self._pending.get(key)
+        if not pending:
+            pending = self._pending[key] = deque(self._answers[key])
+        rec = pending.popleft()
+        response = _JsonResponse({'jsonrpc': '2.0', 'id': payload['id'], **rec['answer']})
+        return response, rec['latency'] if self.realtime else 0
+
+
+class AsyncReplayHttpClient(_Replayer):
+    async def __call__(self, payload: Mapping) -> _JsonResponse:
+        response, latency = self._next(payload)
+        if latency:
+            await asyncio.sleep(latency)
+        return response
+
+
+class ReplayHttpClient(_Replayer):
+    def __call__(self, payload: Mapping) -> _JsonResponse:
+        response, latency = self._next(payload)
+        if latency:
+            time.sleep(latency)
+        return response
@@ -0,0 +1,98 @@
+import asyncio
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+
+DEFAULT_WEIGHTS = {'interactive': 8, 'batch': 1}
+
+
+class PriorityScheduler:
+    """Bounds the number of in-flight requests and shares them between priority classes.
+
+    When requests are waiting, freed slots go to the classes in proportion to their weights
+    (stride scheduling), so a class with many queued requests cannot starve another one.
+    A class that was idle starts at the current virtual time: it does not get to catch up
+    on the share it did not use.
+
+    Time spent waiting for a slot is added to metrics as 'queue_wait_seconds:<class>' and the
+    number of calls as 'scheduled_calls:<class>'."""
+
+    max_in_flight: int
+    weights: Dict[str, float]
+    default_priority: str
+    metrics: Counter
+
+    def __init__(self, *,
+                 max_in_flight: int = 8,
+                 weights: Optional[Dict[str, float]] = None,
+                 default_priority: str = 'interactive',
+                 metrics: Optional[Counter] = None):
+        self.max_in_flight = max_in_flight
+        self.weights = dict(weights if weights is not None else DEFAULT_WEIGHTS)
+        if default_priority not in self.weights:
+            raise RuntimeError(f'[aio-odoorpc] Error: default priority {default_priority} has no weight.')
+        self.default_priority = default_priority
+        self.metrics = metrics if metrics is not None else Counter()
+        self._in_flight = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in self.weights}
+        self._pass: Dict[str, float] = {p: 0.0 for p in self.weights}
+        self._vtime = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queued(self, priority: Optional[str] = None) -> int:
+        if priority is None:
+            return sum(len(q) for q in self._queues.values())
+        return len(self._queues[priority])
+
+    async def run(self, priority: Optional[str], coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        priority = priority if priority is not None else self.default_priority
+        if priority not in self.weights:
+            raise RuntimeError(f'[aio-odoorpc] Error: unknown priority {priority}.')
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        if self._in_flight < self.max_in_flight and not self.queued():
+            self._in_flight += 1
+        else:
+            queue = self._queues[priority]
+            if not queue:
+                self._pass[priority] = max(self._pass[priority], self._vtime)
+            fut = loop.create_future()
+            queue.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.cancelled():
+                    if fut in queue:
+                        queue.remove(fut)
+                else:
+                    # the slot was handed over right before the cancellation
+                    self._release()
+                raise
+
+        self.metrics[f'queue_wait_seconds:{priority}'] += loop.time() - start
+        self.metrics[f'scheduled_calls:{priority}'] += 1
+
+        try:
+            return await coro_factory()
+        finally:
+            self._release()
+
+    def _release(self):
+        # Hands the slot over to the waiting request of the class with the lowest pass, if any.
+        while True:
+            waiting = [p for p, q in self._queues.items() if q]
+            if not waiting:
+                self._in_flight -= 1
+                return
+            priority = min(waiting, key=self._pass.__getitem__)
+            fut = self._queues[priority].popleft()
+            self._vtime = self._pass[priority]
+            self._pass[priority] += 1 / self.weights[priority]
+            if not fut.done():
+                fut.set_result(None)
+                return
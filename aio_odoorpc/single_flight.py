@@ -0,0 +1,74 @@
+import asyncio
+import copy
+import functools
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+
+# Odoo model methods that do not change data, so concurrent identical calls may share a single request.
+READ_ONLY_METHODS = frozenset(('search', 'search_count', 'search_read', 'read', 'read_group', 'fields_get',
+                               'name_get', 'name_search', 'default_get', 'check_access_rights'))
+
+
+def single_flight_key(*,
+                      endpoint: Union[str, int],
+                      db: str,
+                      uid: int,
+                      model_name: str,
+                      method: str,
+                      args: Any,
+                      kwargs: Optional[dict]) -> str:
+    # kwargs already carries the context, if any. Keys are sorted so that dicts built
+    # in a different order still produce the same key; tuples and lists are equivalent
+    # on the wire so they are (correctly) serialized the same way.
+    return json.dumps([endpoint, db, uid, model_name, method, args, kwargs],
+                      sort_keys=True, separators=(',', ':'), default=repr)
+
+
+class _Flight:
+    __slots__ = ('fut', 'waiters', 'handed_out')
+
+    def __init__(self, fut: asyncio.Future):
+        self.fut = fut
+        self.waiters = 0
+        self.handed_out = False
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight request.
+
+    The last waiter to resume gets the result itself, every other one a deep copy, so callers
+    are free to change what they get and a request that was not shared is never copied.
+    The shared request is shielded: a caller being cancelled does not cancel it for the others."""
+
+    _in_flight: Dict[str, _Flight]
+
+    def __init__(self):
+        self._in_flight = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def call(self, key: str, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(coro_factory()))
+            self._in_flight[key] = flight
+            flight.fut.add_done_callback(functools.partial(self._forget, key, flight))
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.fut)
+        finally:
+            flight.waiters -= 1
+
+        # Waiters resume one after the other, so when the count reaches zero every other
+        # waiter has already taken its copy.
+        if flight.waiters == 0 and not flight.handed_out:
+            flight.handed_out = True
+            return result
+        return copy.deepcopy(result)
+
+    def _forget(self, key: str, flight: _Flight, fut: asyncio.Future):
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
@@ -0,0 +1,53 @@
+from typing import Mapping, Optional
+from aio_odoorpc_base.protocols import T_AsyncHttpClient, T_HttpClient
+
+
+def response_bytes(resp) -> Optional[int]:
+    # Size of the response body, without reading it again: the body itself when the http client
+    # already holds it (httpx, requests), the Content-Length header otherwise (aiohttp).
+    content = getattr(resp, 'content', None)
+    if isinstance(content, bytes):
+        return len(content)
+    headers = getattr(resp, 'headers', None)
+    if headers is not None and headers.get('Content-Length'):
+        return int(headers['Content-Length'])
+    return None
+
+
+class _JsonResponse:
+    # Stands in for an http response whose json body has already been decoded.
+    def __init__(self, data: Mapping):
+        self._data = data
+
+    def json(self) -> Mapping:
+        return self._data
+
+
+class AsyncMeasuringHttpClient:
+    """Callable http_client that posts through 'http_client' and keeps the size of the response body."""
+
+    response_bytes: Optional[int] = None
+
+    def __init__(self, http_client: T_AsyncHttpClient, url: str):
+        self.http_client = http_client
+        self.url = url
+
+    async def __call__(self, payload: Mapping):
+        resp = await self.http_client.post(self.url, json=payload)
+        self.response_bytes = response_bytes(resp)
+        return resp
+
+
+class MeasuringHttpClient:
+    """Callable http_client that posts through 'http_client' and keeps the size of the response body."""
+
+    response_bytes: Optional[int] = None
+
+    def __init__(self, http_client: T_HttpClient, url: str):
+        self.http_client = http_client
+        self.url = url
+
+    def __call__(self, payload: Mapping):
+        resp = self.http_client.post(self.url, json=payload)
+        self.response_bytes = response_bytes(resp)
+        return resp
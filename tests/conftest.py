@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import json
 from bs4 import BeautifulSoup
 import httpx
 
@@ -79,3 +80,57 @@ def aio_benchmark(benchmark):
             benchmark(func, *args, **kwargs)
     
     return _wrapper
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+        self.content = json.dumps(data).encode()
+        self.headers = {'Content-Length': str(len(self.content))}
+    
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    def __init__(self, fake_odoo):
+        self.fake_odoo = fake_odoo
+    
+    async def post(self, url, *, json):
+        return await self.fake_odoo.aio(json)
+
+
+class FakeOdoo:
+    """Stands in for an Odoo server behind a callable http_client.
+    
+    'handler' is called with (model_name, method, args, kwargs) for every execute_kw call
+    and returns the 'result'. Every call is recorded in 'calls'."""
+    
+    def __init__(self):
+        self.calls = []
+        self.delay = 0
+        self.handler = lambda model_name, method, args, kwargs: []
+    
+    def _respond(self, payload):
+        db, uid, password, model_name, method, args, *kwargs = payload['params']['args']
+        kwargs = kwargs[0] if kwargs else {}
+        self.calls.append((model_name, method, args[0], kwargs))
+        return FakeResponse({'jsonrpc': '2.0', 'id': payload['id'],
+                             'result': self.handler(model_name, method, args[0], kwargs)})
+    
+    def sync(self, payload):
+        return self._respond(payload)
+    
+    async def aio(self, payload):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self._respond(payload)
+    
+    def session(self):
+        """A (non callable) http client with an async 'post', like httpx or aiohttp."""
+        return FakeSession(self)
+
+
+@pytest.fixture(scope='function')
+def fake_odoo():
+    return FakeOdoo()
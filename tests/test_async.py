@@ -4,6 +4,10 @@ from aio_odoorpc import AsyncOdooRPC
 import httpx
 import aiohttp
 import asyncio
+import gc
+import json
+import time
+import warnings
 
 
 @pytest.mark.asyncio
@@ -179,4 +183,382 @@ async def test_write(url_db_user_pwd: list):
         for p in products:
             assert p['standard_price'] == new_price
             assert p['weight'] == new_price
-        
\ No newline at end of file
+        
+
+@pytest.mark.asyncio
+async def test_single_flight(fake_odoo):
+    fake_odoo.delay = 0.01
+    fake_odoo.handler = lambda model_name, method, args, kwargs: [{'id': 1, 'name': 'Acme'}]
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.aio,
+                        default_model_name='res.partner')
+    odoo.set_single_flight()
+    
+    results = await asyncio.gather(*[odoo.search_read([], fields=['name']) for _ in range(10)])
+    assert len(fake_odoo.calls) == 1
+    assert all(r == [{'id': 1, 'name': 'Acme'}] for r in results)
+    
+    # every caller gets its own copy
+    for r in results:
+        r[0]['name'] = 'changed'
+    assert sum(r[0]['name'] == 'changed' for r in results) == 10
+    assert len({id(r) for r in results}) == 10
+    
+    # different args, opted out calls and writes are never shared
+    await asyncio.gather(odoo.search_read([], fields=['name']),
+                         odoo.search_read([], fields=['email']),
+                         odoo.execute_kw('search_read', [], {'fields': ['name']}, single_flight=False),
+                         odoo.write(1, {'name': 'x'}),
+                         odoo.write(1, {'name': 'x'}))
+    assert len(fake_odoo.calls) == 1 + 5
+
+
+@pytest.mark.asyncio
+async def test_single_flight_context(fake_odoo):
+    fake_odoo.handler = lambda model_name, method, args, kwargs: []
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.aio,
+                        default_model_name='res.partner')
+    odoo.set_single_flight()
+    odoo.forced_context = {'lang': 'en_US'}
+    
+    # an explicit context is kept and merged with the forced one, so calls with different
+    # contexts do not share a request
+    await asyncio.gather(odoo.execute_kw('search', [], {'context': {'active_test': False}}),
+                         odoo.execute_kw('search', []))
+    assert [c[3].get('context') for c in fake_odoo.calls] == [{'active_test': False, 'lang': 'en_US'},
+                                                             {'lang': 'en_US'}]
+    assert odoo.forced_context == {'lang': 'en_US'}
+
+
+@pytest.mark.asyncio
+async def test_read_group(fake_odoo):
+    def handler(model_name, method, args, kwargs):
+        assert method == 'read_group' and kwargs['groupby'] == ['partner_id']
+        amount = 10.0 if args == [['date_order', '<', '2021-01-01']] else 5.0
+        return [{'partner_id': [7, 'Acme'], 'partner_id_count': 2, 'amount_total': amount,
+                 '__domain': [['partner_id', '=', 7]]},
+                {'partner_id': False, 'partner_id_count': 1, 'amount_total': 1.0, '__domain': []}]
+    
+    fake_odoo.handler = handler
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.aio,
+                        default_model_name='sale.order')
+    odoo.set_format_for_id_fields('int')
+    
+    rows = await odoo.read_group([], ['amount_total:sum'], 'partner_id')
+    assert rows == [{'partner_id': 7, 'amount_total': 5.0, '__count': 2},
+                    {'partner_id': None, 'amount_total': 1.0, '__count': 1}]
+    
+    rows = await odoo.read_group_merged([[['date_order', '<', '2021-01-01']], [['date_order', '>=', '2021-01-01']]],
+                                        ['amount_total:sum'], ['partner_id'])
+    assert len(fake_odoo.calls) == 3
+    assert rows == [{'partner_id': 7, 'amount_total': 15.0, '__count': 4},
+                    {'partner_id': None, 'amount_total': 2.0, '__count': 2}]
+
+
+@pytest.mark.asyncio
+async def test_lean_projection(fake_odoo):
+    meta = {'id': {'type': 'integer', 'store': True},
+            'name': {'type': 'char', 'store': True},
+            'image_1920': {'type': 'binary', 'store': True},
+            'description': {'type': 'html', 'store': True},
+            'display_name': {'type': 'char', 'store': False},
+            'notes': {'type': 'text', 'store': True}}
+    
+    def handler(model_name, method, args, kwargs):
+        return meta if method == 'fields_get' else [{'id': 1, 'name': 'x' * 100}]
+    
+    fake_odoo.handler = handler
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.session(),
+                        default_model_name='product.template')
+    odoo.set_lean_projection(allow={'product.template': ['description']},
+                             deny={'product.template': ['notes']},
+                             large_payload_bytes=50)
+    
+    with pytest.warns(UserWarning, match='set_lean_projection') as record:
+        await odoo.search_read([])
+    # the large fields_get answer is only counted
+    assert len(record) == 1
+    with pytest.warns(UserWarning):
+        await odoo.new_for_model('product.template').read([1])
+    # as are calls with an explicit list of fields
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        await odoo.search_read([], fields=['image_1920'])
+    
+    # fields_get is called once and cached, also for copies
+    assert [c[1] for c in fake_odoo.calls] == ['fields_get', 'search_read', 'read', 'search_read']
+    assert fake_odoo.calls[1][3]['fields'] == ['id', 'name', 'description']
+    assert fake_odoo.calls[2][3]['fields'] == ['id', 'name', 'description']
+    assert fake_odoo.calls[3][3]['fields'] == ['image_1920']
+    assert odoo.metrics['large_payloads'] == 4
+
+
+@pytest.mark.asyncio
+async def test_compression():
+    import gzip
+    
+    class FakeResponse:
+        def __init__(self, data):
+            self.content = json.dumps(data).encode()
+            self.headers = {'Content-Encoding': 'gzip', 'Content-Length': str(len(gzip.compress(self.content)))}
+        
+        def json(self):
+            return json.loads(self.content)
+    
+    class FakeSession:
+        async def post(self, url, *, data, headers):
+            self.headers = headers
+            body = gzip.decompress(data) if headers.get('Content-Encoding') == 'gzip' else data
+            payload = json.loads(body)
+            return FakeResponse({'jsonrpc': '2.0', 'id': payload['id'], 'result': [{'id': 1, 'name': 'a' * 10000}]})
+    
+    session = FakeSession()
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=session,
+                        default_model_name='res.partner')
+    odoo.set_compression(compress_requests=True, threshold=1024)
+    
+    await odoo.search_read([['id', 'in', list(range(10))]])
+    assert 'Content-Encoding' not in session.headers and session.headers['Accept-Encoding'] == 'gzip'
+    
+    data = await odoo.search_read([['id', 'in', list(range(1000))]], fields=['name'])
+    assert data[0]['name'] == 'a' * 10000
+    assert session.headers['Content-Encoding'] == 'gzip'
+    assert odoo.metrics['request_bytes_sent'] < odoo.metrics['request_bytes_raw']
+    assert odoo.metrics['response_bytes_received'] < odoo.metrics['response_bytes_raw']
+
+
+def test_compression_threshold_recovers():
+    from aio_odoorpc.compression import Compression
+    
+    compression = Compression(compress_requests=True, threshold=1024, probe_every=4)
+    # as after a few slow encodes
+    compression.threshold = compression.max_threshold
+    payload = {'params': {'args': ['x' * 4096]}}
+    
+    sent = [compression.encode(payload)[1].get('Content-Encoding') for _ in range(8)]
+    assert sent.count('gzip') >= 1
+    assert compression.threshold <= len(json.dumps(payload))
+    assert compression.encode(payload)[1].get('Content-Encoding') == 'gzip'
+
+
+@pytest.mark.asyncio
+async def test_scheduler(fake_odoo):
+    fake_odoo.delay = 0.001
+    fake_odoo.handler = lambda model_name, method, args, kwargs: args
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.aio,
+                        default_model_name='res.partner')
+    odoo.set_scheduler(max_in_flight=1, weights={'interactive': 4, 'batch': 1})
+    batch = odoo.with_priority('batch')
+    
+    tasks = [asyncio.create_task(batch.search_count([['id', '=', i]])) for i in range(20)]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(odoo.search_count([['id', '=', i]])) for i in range(100, 104)]
+    await asyncio.gather(*tasks)
+    
+    # the interactive calls are served within the first few slots, not after the 20 batch calls
+    order = [c[2][0][2] for c in fake_odoo.calls]
+    assert max(order.index(i) for i in range(100, 104)) <= 6
+    assert odoo.metrics['scheduled_calls:batch'] == 20
+    assert odoo.metrics['scheduled_calls:interactive'] == 4
+    assert odoo.metrics['queue_wait_seconds:batch'] > 0
+    assert odoo.scheduler.in_flight == 0 and odoo.scheduler.queued() == 0
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay(fake_odoo, tmp_path):
+    from aio_odoorpc.replay import AsyncRecordingHttpClient, AsyncReplayHttpClient
+    
+    fake_odoo.handler = lambda model_name, method, args, kwargs: [{'id': i, 'name': f'name{i}'} for i in args]
+    path = str(tmp_path / 'calls.jsonl.gz')
+    
+    with AsyncRecordingHttpClient(fake_odoo.aio, path) as recorder:
+        odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='secret', http_client=recorder,
+                            default_model_name='res.partner')
+        recorded = [await odoo.read([1, 2]), await odoo.read([3])]
+    
+    replay = AsyncReplayHttpClient(path, realtime=False)
+    assert len(replay) == 2
+    odoo = AsyncOdooRPC(database='other', username_or_uid=5, password='pwd', http_client=replay,
+                        default_model_name='res.partner')
+    assert [await odoo.read([1, 2]), await odoo.read([3]), await odoo.read([3])] == recorded + recorded[1:]
+    
+    with pytest.raises(RuntimeError):
+        await odoo.read([4])
+    
+    import gzip
+    with gzip.open(path, 'rt') as f:
+        assert 'secret' not in f.read()
+
+
+@pytest.mark.asyncio
+async def test_off_loop(fake_odoo):
+    class FakeResponse:
+        def __init__(self, content):
+            self.content = content
+    
+    class FakeSession:
+        async def post(self, url, **kwargs):
+            resp = await fake_odoo.aio(kwargs['json'])
+            return FakeResponse(json.dumps(resp.json()).encode())
+    
+    # the 'domain' is the number of rows to return
+    fake_odoo.handler = lambda model_name, method, args, kwargs: [{'id': i, 'partner_id': [i, 'x']} for i in range(args)]
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=FakeSession(),
+                        default_model_name='sale.order')
+    odoo.set_format_for_id_fields('int')
+    odoo.set_off_loop(threshold_bytes=1000, threshold_rows=100)
+    
+    small = await odoo.search_read(2, fields=['partner_id'])
+    assert small == [{'id': 0, 'partner_id': 0}, {'id': 1, 'partner_id': 1}]
+    assert odoo.metrics['on_loop_decodes'] == 1 and odoo.metrics['off_loop_decodes'] == 0
+    
+    large = await odoo.search_read(200, fields=['partner_id'])
+    assert large == [{'id': i, 'partner_id': i} for i in range(200)]
+    assert odoo.metrics['off_loop_decodes'] == 1 and odoo.metrics['off_loop_post_processing'] == 1
+    
+    # rows are formatted on the loop, so any getter works
+    odoo.getter_id_fields = lambda v: v[1]
+    assert await odoo.search_read(200, fields=['partner_id']) == [{'id': i, 'partner_id': 'x'} for i in range(200)]
+
+
+@pytest.mark.asyncio
+async def test_off_loop_responsiveness():
+    from aio_odoorpc.off_loop import OffLoop
+    
+    rows = [{'id': i, 'name': f'Partner {i}', 'partner_id': [i, 'Acme'], 'note': 'x' * 100}
+            for i in range(100000)]
+    body = json.dumps({'jsonrpc': '2.0', 'id': 1, 'result': rows}).encode()
+    start = time.perf_counter()
+    expected = json.loads(body)
+    blocking = time.perf_counter() - start
+    
+    max_gap, done = 0, False
+    
+    async def ticker():
+        nonlocal max_gap
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            max_gap, last = max(max_gap, now - last), now
+    
+    off_loop = OffLoop(threshold_bytes=1024, chunk_bytes=64 * 1024)
+    task = asyncio.ensure_future(ticker())
+    # collections of the growing heap pause the loop whichever way the body is decoded
+    gc.disable()
+    try:
+        assert await off_loop.decode(body) == expected
+    finally:
+        gc.enable()
+    done = True
+    await task
+    
+    assert off_loop.metrics['off_loop_yields'] > 10
+    assert max_gap < blocking / 3
+    
+    for doc in ('[]', ' { "a" : [ 1 , {"b": []} ] , "c": {} } ', '{"jsonrpc": "2.0", "id": 1, "error": {"code": 200}}'):
+        assert await off_loop.decode(doc.encode().ljust(1024)) == json.loads(doc)
+    for doc in ('{"a": [1,]}', '{"a" 1}', '{1: 2}', '[1] x'):
+        with pytest.raises(json.JSONDecodeError):
+            await off_loop.decode(doc.encode().ljust(1024))
+
+
+@pytest.mark.asyncio
+async def test_name_cache(fake_odoo):
+    names = {7: 'Acme', 8: 'Globex', 9: 'Initech'}
+    
+    def handler(model_name, method, args, kwargs):
+        if method == 'fields_get':
+            return {'partner_id': {'type': 'many2one', 'store': True, 'relation': 'res.partner'},
+                    'name': {'type': 'char', 'store': True}}
+        if method == 'search_read':
+            return [{'id': 1, 'name': 'SO1', 'partner_id': [7, 'Acme']}]
+        if method == 'name_search':
+            return [[i, n] for i, n in names.items() if args.lower() in n.lower()]
+        return [[i, names[i]] for i in args]
+    
+    fake_odoo.handler = handler
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.aio,
+                        default_model_name='sale.order')
+    odoo.set_name_cache(batch_size=1)
+    odoo.set_format_for_id_fields('int')
+    
+    assert await odoo.search_read([], fields=['name', 'partner_id']) == [{'id': 1, 'name': 'SO1', 'partner_id': 7}]
+    assert await odoo.name_search('glo', model_name='res.partner') == [(8, 'Globex')]
+    calls = len(fake_odoo.calls)
+    
+    # 7 seeded from search_read, 8 from name_search: only 9 goes to the server
+    assert await odoo.name_get([7, 8, 9], model_name='res.partner') == [(7, 'Acme'), (8, 'Globex'), (9, 'Initech')]
+    assert fake_odoo.calls[calls:] == [('res.partner', 'name_get', [9], {})]
+    
+    await odoo.name_get([9, 7], model_name='res.partner')
+    assert len(fake_odoo.calls) == calls + 1
+
+
+@pytest.mark.asyncio
+async def test_read_group_merged_aggregates(fake_odoo):
+    def handler(model_name, method, args, kwargs):
+        late = args == [['date_order', '>=', '2021-01-01']]
+        return [{'partner_id': [7, 'Acme'], 'partner_id_count': 1, 'invoiced': late, 'paid': late}]
+    
+    fake_odoo.handler = handler
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.aio,
+                        default_model_name='sale.order')
+    buckets = [[['date_order', '<', '2021-01-01']], [['date_order', '>=', '2021-01-01']]]
+    
+    rows = await odoo.read_group_merged(buckets, ['invoiced:bool_and', 'paid:bool_or'], 'partner_id')
+    assert rows == [{'partner_id': [7, 'Acme'], 'invoiced': False, 'paid': True, '__count': 2}]
+    
+    with pytest.raises(RuntimeError):
+        await odoo.read_group_merged(buckets, ['user_id:count_distinct'], 'partner_id')
+    assert len(fake_odoo.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_group_merged_group_operator(fake_odoo):
+    def handler(model_name, method, args, kwargs):
+        if method == 'fields_get':
+            assert 'group_operator' in kwargs['attributes']
+            return {'delay': {'type': 'float', 'group_operator': 'max'},
+                    'amount_total': {'type': 'monetary'},
+                    'partner_id': {'type': 'many2one'}}
+        late = args == [['date_order', '>=', '2021-01-01']]
+        return [{'partner_id': [7, 'Acme'], 'partner_id_count': 1,
+                 'delay': 3.0 if late else 5.0, 'amount_total': 10.0}]
+    
+    fake_odoo.handler = handler
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.aio,
+                        default_model_name='sale.order')
+    buckets = [[['date_order', '<', '2021-01-01']], [['date_order', '>=', '2021-01-01']]]
+    
+    rows = await odoo.read_group_merged(buckets, ['partner_id', 'delay', 'amount_total'], 'partner_id')
+    assert rows == [{'partner_id': [7, 'Acme'], 'delay': 5.0, 'amount_total': 20.0, '__count': 2}]
+    assert [c[1] for c in fake_odoo.calls] == ['fields_get', 'read_group', 'read_group']
+
+
+@pytest.mark.asyncio
+async def test_with_priority_keeps_settings(fake_odoo):
+    fake_odoo.handler = lambda model_name, method, args, kwargs: [{'id': 1, 'partner_id': [7, 'Acme']}]
+    odoo = AsyncOdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.aio,
+                        default_model_name='sale.order')
+    odoo.set_format_for_id_fields('int')
+    odoo.forced_context = {'lang': 'en_US'}
+    odoo.set_scheduler()
+    
+    batch = odoo.with_priority('batch')
+    assert batch.forced_context == {'lang': 'en_US'}
+    assert await batch.search_read([], fields=['partner_id']) == [{'id': 1, 'partner_id': 7}]
+    assert fake_odoo.calls[0][3]['context'] == {'lang': 'en_US'}
+    assert odoo.metrics['scheduled_calls:batch'] == 1
+
+
+def test_name_cache_discard():
+    from aio_odoorpc.name_cache import NameCache
+    
+    cache = NameCache(max_entries=3)
+    cache.put('res.partner', 'ctx1', [(1, 'Acme'), (2, 'Globex')])
+    cache.put('res.partner', 'ctx2', [(1, 'Acme'), (3, 'Initech')])
+    # ('res.partner', 'ctx1', 1) was evicted, discarding its id must not trip over it
+    assert len(cache) == 3 and cache.get('res.partner', 'ctx1', 1) is None
+    cache.discard('res.partner', [1, 2, 4])
+    assert len(cache) == 1 and cache.get('res.partner', 'ctx2', 3) == 'Initech'
+    assert cache._contexts == {('res.partner', 3): {'ctx2'}}
@@ -77,3 +77,78 @@ def sync_test(url, db, user, pwd, http_client):
         
         for f in fields:
             assert data1[ids[i]][f] == data2[ids[i]][f]
+
+
+def test_record_cache(fake_odoo):
+    write_dates = {1: '2021-01-01 00:00:00', 2: '2021-01-01 00:00:00', 3: '2021-01-01 00:00:00'}
+    
+    def handler(model_name, method, args, kwargs):
+        if method == 'fields_get':
+            return {'name': {'type': 'char'}, 'write_date': {'type': 'datetime'}}
+        if method == 'search_read':
+            ids = args[0][2]
+            return [{'id': i, 'write_date': write_dates[i]} for i in ids if i in write_dates]
+        return [{'id': i, 'name': f'name{i}', 'partner_id': [7, 'Acme'], 'write_date': write_dates[i]} for i in args]
+    
+    fake_odoo.handler = handler
+    odoo = OdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.sync,
+                   default_model_name='res.partner')
+    odoo.set_record_cache()
+    odoo.set_format_for_id_fields('int')
+    
+    first = odoo.read([1, 2, 3], fields=['name', 'partner_id'])
+    assert first == [{'id': i, 'name': f'name{i}', 'partner_id': 7} for i in (1, 2, 3)]
+    
+    write_dates[2] = '2021-02-01 00:00:00'
+    del write_dates[3]
+    assert odoo.read([3, 2, 1], fields=['name']) == [{'id': 2, 'name': 'name2'}, {'id': 1, 'name': 'name1'}]
+    assert [(c[1], c[2]) for c in fake_odoo.calls[2:]] == [('search_read', [['id', 'in', [3, 2, 1]]]),
+                                                           ('read', [2])]
+    
+    # fields not in the cache are read
+    odoo.read([1], fields=['email'])
+    assert fake_odoo.calls[-1][1] == 'read'
+
+
+def test_record_cache_archived_and_no_write_date(fake_odoo):
+    active = {1: True, 2: False}
+    log_access = {'res.partner': True, 'ir.model.data': False}
+    
+    def handler(model_name, method, args, kwargs):
+        if method == 'fields_get':
+            return {'name': {'type': 'char'}, **({'write_date': {'type': 'datetime'}} if log_access[model_name] else {})}
+        if method == 'search_read':
+            active_test = kwargs.get('context', {}).get('active_test', True)
+            return [{'id': i, 'write_date': '2021-01-01 00:00:00'} for i in args[0][2]
+                    if active[i] or not active_test]
+        return [{'id': i, 'name': f'name{i}', **({'write_date': '2021-01-01 00:00:00'} if log_access[model_name] else {})}
+                for i in args]
+    
+    fake_odoo.handler = handler
+    odoo = OdooRPC(database='db', username_or_uid=2, password='pwd', http_client=fake_odoo.sync,
+                   default_model_name='res.partner')
+    odoo.set_record_cache()
+    
+    expected = [{'id': 1, 'name': 'name1'}, {'id': 2, 'name': 'name2'}]
+    assert odoo.read([1, 2], fields=['name']) == expected
+    # the archived record is revalidated, not taken for deleted
+    assert odoo.read([1, 2], fields=['name']) == expected
+    assert [c[1] for c in fake_odoo.calls] == ['fields_get', 'read', 'search_read']
+    
+    # without a write_date there is nothing to revalidate with, records are read as usual
+    assert odoo.read([1], fields=['name'], model_name='ir.model.data') == [{'id': 1, 'name': 'name1'}]
+    assert odoo.read([1], fields=['name'], model_name='ir.model.data') == [{'id': 1, 'name': 'name1'}]
+    assert [c[1] for c in fake_odoo.calls[3:]] == ['fields_get', 'read', 'read']
+
+
+def test_record_cache_discard():
+    from aio_odoorpc.record_cache import RecordCache
+    
+    cache = RecordCache(max_records=3)
+    cache.put('res.partner', 'ctx1', [{'id': 1}, {'id': 2}], None)
+    cache.put('res.partner', 'ctx2', [{'id': 1}, {'id': 3}], None)
+    # ('res.partner', 'ctx1', 1) was evicted, discarding its id must not trip over it
+    assert len(cache) == 3 and cache.get('res.partner', 'ctx1', 1, None) is None
+    cache.discard('res.partner', [1, 2, 4])
+    assert len(cache) == 1 and cache.get('res.partner', 'ctx2', 3, None) == {'id': 3}
+    assert cache._contexts == {('res.partner', 3): {'ctx2'}}